@@ -0,0 +1,133 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+GENRES = [
+    {'id': 28, 'name': 'Action'}, {'id': 35, 'name': 'Comedy'}, {'id': 18, 'name': 'Drama'},
+    {'id': 27, 'name': 'Horror'}, {'id': 878, 'name': 'Science Fiction'}, {'id': 53, 'name': 'Thriller'}
+]
+MOVIES_PER_PAGE = 20
+
+class FakeTMDBConfig:
+    """Shape of the fake catalog and the failure behaviour of the fake API."""
+
+    def __init__(self, pages_per_year: int = 10, latency_ms: float = 50.0, jitter_ms: float = 10.0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 1.0):
+        self.pages_per_year = pages_per_year
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+def _movie(year: int, page: int, index: int) -> dict:
+    """A deterministic discover result, so every run sees the same catalog."""
+    movie_id = year * 100000 + page * 100 + index
+    return {
+        'id': movie_id,
+        'title': f"Benchmark Movie {movie_id}",
+        'overview': f"Synthetic movie {index} from page {page} of {year}.",
+        'release_date': f"{year}-01-{index % 28 + 1:02d}",
+        'poster_path': f"/poster{movie_id}.jpg",
+        'vote_average': round((movie_id % 100) / 10, 1),
+        'genre_ids': [GENRES[movie_id % len(GENRES)]['id'], GENRES[(movie_id // 7) % len(GENRES)]['id']]
+    }
+
+def _providers(movie_id: int) -> dict:
+    return {
+        'link': f"https://www.themoviedb.org/movie/{movie_id}/watch?locale=IN",
+        'flatrate': [{'logo_path': '/logo8.jpg', 'provider_id': 8, 'provider_name': 'Netflix', 'display_priority': 1}],
+        'rent': [{'logo_path': '/logo2.jpg', 'provider_id': 2, 'provider_name': 'Apple TV', 'display_priority': 4}]
+    }
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so pooled clients can keep connections alive, as they would against TMDB
+    protocol_version = 'HTTP/1.1'
+    config: FakeTMDBConfig = None
+
+    def log_message(self, format, *args):
+        pass # Keep benchmark output readable
+
+    def do_GET(self):
+        config = self.config
+        delay = max(0.0, config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)) / 1000
+        time.sleep(delay)
+
+        roll = random.random()
+        if roll < config.throttle_rate:
+            return self._send(429, {'status_code': 25, 'status_message': 'Rate limit exceeded.'},
+                              {'Retry-After': str(config.retry_after)})
+        if roll < config.throttle_rate + config.error_rate:
+            return self._send(503, {'status_message': 'Service unavailable.'})
+
+        url = urlparse(self.path)
+        path = url.path.removeprefix('/3')
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        body = self._route(path, query)
+        if body is None:
+            return self._send(404, {'status_code': 34, 'status_message': 'The resource could not be found.'})
+        self._send(200, body)
+
+    def _route(self, path: str, query: dict):
+        if path == '/genre/movie/list':
+            return {'genres': GENRES}
+        if path == '/discover/movie':
+            year, page = int(query.get('primary_release_year', 2024)), int(query.get('page', 1))
+            results = [_movie(year, page, index) for index in range(MOVIES_PER_PAGE)] if page <= self.config.pages_per_year else []
+            return {'page': page, 'results': results, 'total_pages': self.config.pages_per_year,
+                    'total_results': self.config.pages_per_year * MOVIES_PER_PAGE}
+        if path == '/movie/changes':
+            return {'page': 1, 'results': [], 'total_pages': 1, 'total_results': 0}
+        match = re.fullmatch(r'/movie/(\d+)/watch/providers', path)
+        if match:
+            movie_id = int(match.group(1))
+            return {'id': movie_id, 'results': {'IN': _providers(movie_id)}}
+        match = re.fullmatch(r'/movie/(\d+)', path)
+        if match:
+            movie_id = int(match.group(1))
+            year, page, index = movie_id // 100000, movie_id // 100 % 1000, movie_id % 100
+            details = _movie(year, page, index)
+            genre_ids = details.pop('genre_ids')
+            details['genres'] = [genre for genre in GENRES if genre['id'] in genre_ids]
+            details['watch/providers'] = {'results': {'IN': _providers(movie_id)}}
+            return details
+        return None
+
+    def _send(self, status: int, body: dict, headers: dict = None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+class FakeTMDBServer:
+    """A local stand-in for the TMDB API, served from a background thread."""
+
+    def __init__(self, config: FakeTMDBConfig, host: str = '127.0.0.1', port: int = 0):
+        handler = type('FakeTMDBHandler', (_Handler,), {'config': config})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/3"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,174 @@
+"""
+Ingestion throughput benchmark.
+
+Serves a synthetic catalog from a local fake TMDB server (with configurable latency, error rate and
+429 rate) and runs each ingestion mode against it and a local mongod, each mode in its own process
+and on a freshly dropped database. Reports movies/sec, p50/p99 TMDB request latency and Mongo write
+time per mode, and writes them to JSON. Run from the ContentIngestion directory:
+
+    python -m benchmarks.run --modes sync async pipeline --output benchmark_results.json
+    python -m benchmarks.run --baseline benchmark_results.json   # fails if a mode got slower
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pymongo import MongoClient
+from .fake_tmdb import FakeTMDBConfig, FakeTMDBServer, MOVIES_PER_PAGE
+from .worker import RESULT_PREFIX
+
+MODES = ["sync", "async", "pipeline"]
+BENCHMARK_DB_NAME = "ingestion_benchmark"
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+@contextmanager
+def local_mongod():
+    """Starts a throwaway mongod on a free port and yields its URI."""
+    binary = shutil.which('mongod')
+    if binary is None:
+        raise SystemExit("❌ --spawn-mongod needs a 'mongod' binary on PATH.")
+    dbpath = tempfile.mkdtemp(prefix="ingestion-benchmark-")
+    port = _free_port()
+    process = subprocess.Popen(
+        [binary, '--dbpath', dbpath, '--port', str(port), '--bind_ip', '127.0.0.1', '--quiet'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    uri = f"mongodb://127.0.0.1:{port}"
+    try:
+        client = MongoClient(uri, serverSelectionTimeoutMS=30000)
+        client.admin.command('ping')
+        client.close()
+        yield uri
+    finally:
+        process.terminate()
+        process.wait()
+        shutil.rmtree(dbpath, ignore_errors=True)
+
+@contextmanager
+def _given(uri: str):
+    """An already running mongod."""
+    yield uri
+
+def _run_mode(mode: str, env: dict, mongo_uri: str, fresh: bool) -> dict:
+    """Runs one ingestion mode in a subprocess and returns its measurements."""
+    if fresh:
+        client = MongoClient(mongo_uri)
+        client.drop_database(BENCHMARK_DB_NAME)
+        client.close()
+
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.worker', mode],
+        env=env, capture_output=True, text=True
+    )
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    print(completed.stdout[-2000:])
+    print(completed.stderr[-2000:])
+    raise SystemExit(f"❌ Benchmark worker for '{mode}' produced no result (exit code {completed.returncode}).")
+
+def _compare_with_baseline(results: dict, baseline_path: str, tolerance: float) -> list:
+    """Returns a description of every mode whose throughput dropped by more than `tolerance`."""
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)['results']
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline or not baseline[name]['movies_per_sec']:
+            continue
+        previous, current = baseline[name]['movies_per_sec'], result['movies_per_sec']
+        if current < previous * (1 - tolerance):
+            regressions.append(f"{name}: {current} movies/s vs {previous} movies/s in the baseline")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ContentIngestion against a local fake TMDB and mongod.")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--rerun", action="store_true",
+                        help="Also run every mode a second time over the populated catalog (reported as '<mode>-rerun').")
+    parser.add_argument("--years", type=int, default=2, help="Number of release years to ingest.")
+    parser.add_argument("--pages-per-year", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Mean fake TMDB response time.")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429.")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with each 429.")
+    parser.add_argument("--rate-limit", type=float, default=1000.0, help="Client-side TMDB_RATE_LIMIT during the runs.")
+    parser.add_argument("--concurrency", type=int, default=None, help="INGEST_CONCURRENCY during the runs.")
+    parser.add_argument("--mongo-uri", default=os.getenv("BENCHMARK_MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--spawn-mongod", action="store_true", help="Start a throwaway mongod instead of using --mongo-uri.")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Previous results file; exit non-zero if any mode's movies/sec regressed.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative throughput drop against --baseline.")
+    args = parser.parse_args()
+
+    config = FakeTMDBConfig(
+        pages_per_year=args.pages_per_year, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate, retry_after=args.retry_after
+    )
+    end_year = datetime.now(timezone.utc).year
+    start_year = end_year - args.years + 1
+
+    with FakeTMDBServer(config) as server, (local_mongod() if args.spawn_mongod else _given(args.mongo_uri)) as mongo_uri:
+        env = {
+            **os.environ,
+            'TMDB_API_URL': server.url,
+            'TMDB_API_KEY': os.getenv('TMDB_API_KEY', 'benchmark'),
+            'TMDB_READ_ACCESS_TOKEN': os.getenv('TMDB_READ_ACCESS_TOKEN', 'benchmark'),
+            'MONGO_URI': mongo_uri,
+            'MONGO_DB_NAME': BENCHMARK_DB_NAME,
+            'START_YEAR': str(start_year),
+            'END_YEAR': str(end_year),
+            'TMDB_RATE_LIMIT': str(args.rate_limit),
+            'TMDB_RATE_BURST': str(max(1, int(args.rate_limit))),
+            'TMDB_RECORD_PATH': '',
+            'TMDB_REPLAY_PATH': '',
+        }
+        if args.concurrency:
+            env['INGEST_CONCURRENCY'] = str(args.concurrency)
+
+        print(f"🏁 Benchmarking {', '.join(args.modes)} over {args.years * args.pages_per_year * MOVIES_PER_PAGE} "
+              f"movies (fake TMDB at {server.url}, mongod at {mongo_uri})")
+        results = {}
+        for mode in args.modes:
+            results[mode] = _run_mode(mode, env, mongo_uri, fresh=True)
+            print(f"  {mode}: {results[mode]['movies_per_sec']} movies/s in {results[mode]['seconds']}s")
+            if args.rerun:
+                results[f"{mode}-rerun"] = _run_mode(mode, env, mongo_uri, fresh=False)
+                print(f"  {mode}-rerun: {results[f'{mode}-rerun']['movies_per_sec']} movies/s, "
+                      f"{results[f'{mode}-rerun']['movies_written']} movies written")
+
+        cleanup = MongoClient(mongo_uri)
+        cleanup.drop_database(BENCHMARK_DB_NAME)
+        cleanup.close()
+
+    # Read the baseline before writing, in case --output points at the same file
+    regressions = _compare_with_baseline(results, args.baseline, args.tolerance) if args.baseline else []
+
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'config': {**config.to_dict(), 'years': args.years, 'rate_limit': args.rate_limit, 'concurrency': args.concurrency},
+        'results': results
+    }
+    with open(args.output, 'w') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        for regression in regressions:
+            print(f"❌ Regression — {regression}")
+        if regressions:
+            sys.exit(1)
+        print("✅ No throughput regressions against the baseline.")
+
+if __name__ == "__main__":
+    main()
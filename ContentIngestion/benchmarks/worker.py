@@ -0,0 +1,64 @@
+"""
+Runs one ingestion mode inside a fresh process and prints its measurements as a JSON line.
+Started by benchmarks.run, which points the settings at the fake TMDB server and the benchmark database
+through the environment before anything from `src` is imported.
+"""
+import asyncio
+import json
+import sys
+import threading
+import time
+from pymongo import MongoClient
+
+RESULT_PREFIX = "BENCHMARK_RESULT "
+
+def main():
+    mode = sys.argv[1]
+
+    from src.settings import settings
+    from src.database import db_client
+    from src.rate_limit import tmdb_request_stats
+    from src import ingest
+
+    # Time every Mongo bulk write the run performs
+    writes = {'count': 0, 'documents': 0, 'seconds': 0.0}
+    writes_lock = threading.Lock()
+    bulk_upsert_movies = db_client.bulk_upsert_movies
+
+    def timed_bulk_upsert_movies(movie_documents: list, ordered: bool = True):
+        started = time.perf_counter()
+        bulk_upsert_movies(movie_documents, ordered)
+        elapsed = time.perf_counter() - started
+        with writes_lock:
+            writes['count'] += 1
+            writes['documents'] += len(movie_documents)
+            writes['seconds'] += elapsed
+
+    db_client.bulk_upsert_movies = timed_bulk_upsert_movies
+
+    started = time.perf_counter()
+    if mode == 'sync':
+        ingest.run_ingestion()
+    else:
+        asyncio.run(ingest.run_ingestion_async(staged=mode == 'pipeline'))
+    elapsed = time.perf_counter() - started
+
+    client = MongoClient(settings.MONGO_URI)
+    catalog_movies = client[settings.MONGO_DB_NAME]['movies'].count_documents({})
+    client.close()
+
+    result = {
+        'seconds': round(elapsed, 3),
+        'catalog_movies': catalog_movies,
+        'movies_written': writes['documents'],
+        'movies_per_sec': round(catalog_movies / elapsed, 2) if elapsed else 0.0,
+        'latency_p50_ms': round(tmdb_request_stats.latency_percentile(50) * 1000, 2),
+        'latency_p99_ms': round(tmdb_request_stats.latency_percentile(99) * 1000, 2),
+        'mongo_writes': writes['count'],
+        'mongo_write_seconds': round(writes['seconds'], 3),
+        **tmdb_request_stats.snapshot()
+    }
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+if __name__ == "__main__":
+    main()
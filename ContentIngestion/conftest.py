@@ -0,0 +1,5 @@
+import os
+
+# Settings refuse to load without these; the tests never connect to Mongo or TMDB
+for name in ("MONGO_URI", "MONGO_DB_NAME", "TMDB_API_KEY", "TMDB_READ_ACCESS_TOKEN"):
+    os.environ.setdefault(name, "test")
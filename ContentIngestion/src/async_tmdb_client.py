@@ -0,0 +1,136 @@
+import asyncio
+import time
+import httpx
+from .settings import settings
+from .rate_limit import RETRYABLE_STATUS_CODES, backoff_delay, parse_retry_after, tmdb_rate_limiter, tmdb_request_stats
+from .tmdb_archive import tmdb_archive
+from .tmdb_client import TMDBRequestError
+
+class AsyncTMDBClient:
+    """
+    Async counterpart of TMDBClient, used by the concurrent ingestion mode.
+    All requests share one pooled httpx.AsyncClient, and a semaphore caps how many are in flight.
+    Use it as an async context manager so the connection pool is opened and closed with the run.
+    """
+
+    def __init__(self, concurrency: int = settings.INGEST_CONCURRENCY):
+        self.access_token = settings.TMDB_READ_ACCESS_TOKEN
+        self.base_url = settings.TMDB_API_URL
+        self.headers = {
+            "accept": "application/json",
+            "Authorization": f"Bearer {self.access_token}"
+        }
+        if not self.access_token:
+            raise ValueError("TMDB_READ_ACCESS_TOKEN is not configured.")
+        self.concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._client = None
+        self.stats = tmdb_request_stats
+
+    async def __aenter__(self):
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        self._client = httpx.AsyncClient(headers=self.headers, limits=limits, timeout=settings.TMDB_TIMEOUT)
+        print(f"Async TMDB Client initialized (concurrency={self.concurrency}).")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._client.aclose()
+        self._client = None
+
+    async def _make_request(self, endpoint: str, params: dict = None) -> dict:
+        """
+        Helper function to make a GET request to the TMDB API, bounded by the concurrency cap.
+        Follows the same rate-limit and retry policy as TMDBClient._make_request.
+        """
+        if tmdb_archive.replaying:
+            return self._replay(endpoint, params)
+
+        url = f"{self.base_url}{endpoint}"
+        for attempt in range(settings.TMDB_MAX_RETRIES + 1):
+            await asyncio.sleep(tmdb_rate_limiter.reserve())
+            self.stats.increment('requests')
+            retry_after = None
+            throttled = False
+            try:
+                async with self._semaphore:
+                    started = time.perf_counter()
+                    response = await self._client.get(url, params=params)
+                    self.stats.record_latency(time.perf_counter() - started)
+            except httpx.TransportError as e:
+                error = e
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    try:
+                        response.raise_for_status()
+                        data = response.json()
+                    except (httpx.HTTPError, ValueError) as e:
+                        print(f"❌ API request failed for endpoint {endpoint}: {e}")
+                        data = {}
+                    if tmdb_archive.recording:
+                        tmdb_archive.save(endpoint, params, response.status_code, data)
+                    return data
+                error = f"HTTP {response.status_code}"
+                throttled = response.status_code == 429
+                if throttled:
+                    self.stats.increment('throttled')
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+            if attempt == settings.TMDB_MAX_RETRIES:
+                break
+            delay = backoff_delay(attempt, retry_after)
+            self.stats.increment('retries')
+            if throttled:
+                # Hold back every in-flight request, not just this one
+                tmdb_rate_limiter.pause(delay)
+            else:
+                await asyncio.sleep(delay)
+
+        self.stats.increment('failures')
+        raise TMDBRequestError(f"TMDB request to {endpoint} failed after {settings.TMDB_MAX_RETRIES + 1} attempts: {error}")
+
+    def _replay(self, endpoint: str, params: dict = None) -> dict:
+        """Serves a request from the replay archive; an unrecorded request fails like an exhausted retry."""
+        self.stats.increment('requests')
+        data = tmdb_archive.lookup(endpoint, params)
+        if data is None:
+            self.stats.increment('failures')
+            raise TMDBRequestError(f"No archived TMDB response for {endpoint} {params or {}}")
+        return data
+
+    async def fetch_genres(self) -> tuple:
+        """Fetches the official genre list for movies."""
+        data = await self._make_request("/genre/movie/list")
+        genres = data.get('genres', [])
+        return {genre['id']: genre['name'] for genre in genres}, genres
+
+    async def discover_movies_page(self, year: int, page: int) -> dict:
+        """Fetches a raw discover page (results plus paging info) for a specific year."""
+        params = {
+            'primary_release_year': year,
+            'sort_by': 'popularity.desc',
+            'page': page
+        }
+        return await self._make_request("/discover/movie", params=params)
+
+    async def discover_movies_by_year(self, year: int, page: int) -> list:
+        """Fetches a page of movies for a specific year, sorted by popularity."""
+        data = await self.discover_movies_page(year, page)
+        return data.get('results', [])
+
+    async def fetch_watch_providers(self, movie_id: int) -> dict:
+        """Fetches watch provider information for a movie, focusing on WATCH_PROVIDER_REGION (India by default)."""
+        data = await self._make_request(f"/movie/{movie_id}/watch/providers")
+        return data.get('results', {}).get(settings.WATCH_PROVIDER_REGION, {})
+
+    async def fetch_changed_movies_page(self, start_date: str, end_date: str, page: int) -> dict:
+        """Fetches a page of the /movie/changes feed (IDs of movies edited between the two YYYY-MM-DD dates)."""
+        params = {
+            'start_date': start_date,
+            'end_date': end_date,
+            'page': page
+        }
+        return await self._make_request("/movie/changes", params=params)
+
+    async def fetch_movie_details(self, movie_id: int) -> dict:
+        """Fetches a movie's details with its watch providers appended, in a single request."""
+        return await self._make_request(f"/movie/{movie_id}", params={'append_to_response': 'watch/providers'})
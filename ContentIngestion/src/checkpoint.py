@@ -0,0 +1,100 @@
+import uuid
+from datetime import datetime, timezone
+from .settings import settings
+from .database import db_client
+
+class IngestionCheckpoint:
+    """
+    Progress record of one ingestion run, persisted in the 'ingestion_runs' collection.
+
+    `page` is the last page of `year` that has been written along with every page before it.
+    `completed_movie_ids` holds movies already written from later pages, which finish out of
+    order in the async and pipeline modes. A resumed run continues at `page + 1` and skips those movies.
+    """
+
+    def __init__(self, run_document: dict):
+        self.run_id = run_document['_id']
+        self.started_at = run_document['started_at']
+        self.start_year = run_document['start_year']
+        self.end_year = run_document['end_year']
+        self.year = run_document.get('year', self.start_year)
+        self.page = run_document.get('page', 0)
+        self.completed_movie_ids = set(run_document.get('completed_movie_ids', []))
+        # Pages beyond `page` that are already written, mapped to the movie IDs they contained
+        self._finished_pages = {}
+
+    @classmethod
+    def start(cls, mode: str):
+        """Creates the checkpoint record for a fresh run over START_YEAR..END_YEAR."""
+        now = datetime.now(timezone.utc)
+        run_document = {
+            '_id': uuid.uuid4().hex,
+            'mode': mode,
+            'status': 'running',
+            'started_at': now,
+            'updated_at': now,
+            'start_year': settings.START_YEAR,
+            'end_year': settings.END_YEAR,
+            'year': settings.START_YEAR,
+            'page': 0,
+            'completed_movie_ids': []
+        }
+        db_client.create_ingestion_run(run_document)
+        print(f"Checkpointing ingestion run {run_document['_id']}.")
+        return cls(run_document)
+
+    @classmethod
+    def resume(cls, run_id: str = None):
+        """Loads the given run, or the latest unfinished one. Returns None if there is nothing to resume."""
+        run_document = db_client.find_resumable_run(run_id)
+        if run_document is None or run_document.get('status') == 'completed':
+            return None
+        db_client.update_ingestion_run(run_document['_id'], {'status': 'running', 'updated_at': datetime.now(timezone.utc)})
+        checkpoint = cls(run_document)
+        print(f"↩️  Resuming run {checkpoint.run_id} at year {checkpoint.year}, page {checkpoint.page + 1} "
+              f"({len(checkpoint.completed_movie_ids)} movies beyond it already written).")
+        return checkpoint
+
+    def years(self) -> range:
+        """The years this run still has to process."""
+        return range(self.year, self.end_year + 1)
+
+    def enter_year(self, year: int):
+        """Moves the checkpoint to a new year; a no-op for the year the run is resuming in."""
+        if year == self.year:
+            return
+        self.year = year
+        self.page = 0
+        self.completed_movie_ids.clear()
+        self._finished_pages.clear()
+        self._save()
+
+    def is_completed(self, movie_id: int) -> bool:
+        return movie_id in self.completed_movie_ids
+
+    def mark_page_done(self, page: int, movie_ids: list):
+        """Records that every movie of `page` is written and persists the new position."""
+        self.mark_pages_done({page: movie_ids})
+
+    def mark_pages_done(self, pages: dict):
+        """Records several written pages (page -> movie IDs) with a single checkpoint write."""
+        for page, movie_ids in pages.items():
+            self._finished_pages[page] = movie_ids
+            self.completed_movie_ids.update(movie_ids)
+        while self.page + 1 in self._finished_pages:
+            self.page += 1
+            self.completed_movie_ids.difference_update(self._finished_pages.pop(self.page))
+        self._save()
+
+    def finish(self, status: str):
+        """Marks the run as 'completed' or 'failed'."""
+        now = datetime.now(timezone.utc)
+        db_client.update_ingestion_run(self.run_id, {'status': status, 'updated_at': now, 'finished_at': now})
+
+    def _save(self):
+        db_client.update_ingestion_run(self.run_id, {
+            'year': self.year,
+            'page': self.page,
+            'completed_movie_ids': sorted(self.completed_movie_ids),
+            'updated_at': datetime.now(timezone.utc)
+        })
@@ -1,6 +1,7 @@
-from pymongo import MongoClient, UpdateOne
+from pymongo import MongoClient, ReplaceOne, UpdateOne, DESCENDING
 from pymongo.errors import ConnectionFailure
 from .settings import settings
+from .documents import watch_provider_row
 
 class Database:
     """Manages connection to MongoDB and provides bulk write capabilities."""
@@ -12,6 +13,12 @@ class Database:
             self.db = self.client[settings.MONGO_DB_NAME]
             self.movies_collection = self.db['movies']
             self.genres_collection = self.db['genres']
+            self.runs_collection = self.db['ingestion_runs']
+            self.sync_state_collection = self.db['sync_state']
+            self.watch_providers_collection = self.db['watch_providers']
+            self.providers_collection = self.db['providers']
+            # {provider_id: {name, logo_path}} already stored, so each provider is written once per process
+            self._interned_providers = {}
             print("✅ MongoDB connection successful.")
         except ConnectionFailure as e:
             print(f"❌ MongoDB connection failed: {e}")
@@ -22,19 +29,95 @@ class Database:
         self.client.close()
         print("MongoDB connection closed.")
 
-    def bulk_upsert_movies(self, movie_documents: list):
+    def bulk_upsert_movies(self, movie_documents: list, ordered: bool = True):
         """
         Performs a bulk upsert operation for movie documents.
         'upsert=True' means it will update existing movies and insert new ones.
+        Upserts keyed by _id are independent, so ordered=False lets the server apply them in
+        any order without stopping at the first error.
+        A document's 'watch_providers' are not stored on the movie: they are written to the
+        watch_providers collection for WATCH_PROVIDER_REGION, and any embedded copy is removed.
         """
         if not movie_documents:
             return
-            
+
+        operations = []
+        provider_rows = []
+        referenced_providers = {}
+        for doc in movie_documents:
+            fields = {key: value for key, value in doc.items() if key != 'watch_providers'}
+            operations.append(
+                UpdateOne({'_id': doc['_id']}, {'$set': fields, '$unset': {'watch_providers': ''}}, upsert=True)
+            )
+            if 'watch_providers' in doc:
+                row, providers = watch_provider_row(doc['_id'], settings.WATCH_PROVIDER_REGION, doc['watch_providers'] or {})
+                provider_rows.append(row)
+                referenced_providers.update(providers)
+        self.movies_collection.bulk_write(operations, ordered=ordered)
+        self.upsert_watch_providers(provider_rows, referenced_providers)
+
+    def upsert_watch_providers(self, rows: list, providers: dict):
+        """
+        Replaces the given watch_providers rows (one per movie and region) and interns the
+        provider details they reference into the providers collection.
+        """
+        changed = {
+            provider_id: details for provider_id, details in providers.items()
+            if self._interned_providers.get(provider_id) != details
+        }
+        if changed:
+            self.providers_collection.bulk_write([
+                UpdateOne({'_id': provider_id}, {'$set': details}, upsert=True)
+                for provider_id, details in changed.items()
+            ], ordered=False)
+            self._interned_providers.update(changed)
+        if rows:
+            self.watch_providers_collection.bulk_write(
+                [ReplaceOne({'_id': row['_id']}, row, upsert=True) for row in rows],
+                ordered=False
+            )
+
+    def iter_embedded_watch_providers(self):
+        """Iterates over movies that still carry a 'watch_providers' blob from before the split."""
+        return self.movies_collection.find({'watch_providers': {'$exists': True}}, {'watch_providers': 1})
+
+    def unset_embedded_watch_providers(self, movie_ids: list):
+        """Removes the embedded 'watch_providers' blob from the given movies."""
+        if not movie_ids:
+            return
+        self.movies_collection.update_many({'_id': {'$in': list(movie_ids)}}, {'$unset': {'watch_providers': ''}})
+
+    def fetch_content_hashes(self, movie_ids: list) -> dict:
+        """Returns {movie_id: content_hash} for the given movies that are already stored."""
+        if not movie_ids:
+            return {}
+        cursor = self.movies_collection.find({'_id': {'$in': list(movie_ids)}}, {'content_hash': 1})
+        return {doc['_id']: doc.get('content_hash') for doc in cursor}
+
+    def find_existing_movie_ids(self, movie_ids: list) -> set:
+        """Returns the subset of `movie_ids` that already have a document in the movies collection."""
+        if not movie_ids:
+            return set()
+        cursor = self.movies_collection.find({'_id': {'$in': list(movie_ids)}}, {'_id': 1})
+        return {doc['_id'] for doc in cursor}
+
+    def iter_movies_for_embedding(self):
+        """Iterates over every movie with just the fields the knowledge base needs."""
+        projection = {
+            'title': 1, 'overview': 1, 'release_date': 1, 'vote_average': 1,
+            'genres': 1, 'poster_path': 1, 'embedding_text_hash': 1
+        }
+        return self.movies_collection.find({}, projection)
+
+    def set_embedding_text_hashes(self, text_hashes: dict):
+        """Records, per movie ID, the hash of the text whose embedding is now in the knowledge base."""
+        if not text_hashes:
+            return
         operations = [
-            UpdateOne({'_id': doc['_id']}, {'$set': doc}, upsert=True)
-            for doc in movie_documents
+            UpdateOne({'_id': movie_id}, {'$set': {'embedding_text_hash': text_hash}})
+            for movie_id, text_hash in text_hashes.items()
         ]
-        self.movies_collection.bulk_write(operations)
+        self.movies_collection.bulk_write(operations, ordered=False)
 
     def upsert_genres(self, genres: list):
         """Performs a bulk upsert for genres to create a local genre map."""
@@ -48,5 +131,43 @@ class Database:
         self.genres_collection.bulk_write(operations)
         print(f"Successfully stored/updated {len(genres)} genres.")
 
+    def create_ingestion_run(self, run_document: dict):
+        """Stores the checkpoint record of a new ingestion run."""
+        self.runs_collection.insert_one(run_document)
+
+    def update_ingestion_run(self, run_id: str, fields: dict):
+        """Updates the checkpoint record of an ingestion run."""
+        self.runs_collection.update_one({'_id': run_id}, {'$set': fields})
+
+    def get_high_water_mark(self, feed: str):
+        """Returns the timestamp up to which `feed` has been synced, or None if it never was."""
+        state = self.sync_state_collection.find_one({'_id': feed})
+        return state.get('high_water_mark') if state else None
+
+    def set_high_water_mark(self, feed: str, timestamp):
+        """Advances the high-water mark of `feed`; never moves it backwards."""
+        self.sync_state_collection.update_one(
+            {'_id': feed},
+            {'$max': {'high_water_mark': timestamp}},
+            upsert=True
+        )
+
+    def initialize_high_water_mark(self, feed: str, timestamp):
+        """Sets the high-water mark of `feed` only if it has none yet."""
+        self.sync_state_collection.update_one(
+            {'_id': feed},
+            {'$setOnInsert': {'high_water_mark': timestamp}},
+            upsert=True
+        )
+
+    def find_resumable_run(self, run_id: str = None):
+        """Returns the given run, or the most recently started one that did not complete."""
+        if run_id:
+            return self.runs_collection.find_one({'_id': run_id})
+        return self.runs_collection.find_one(
+            {'status': {'$ne': 'completed'}},
+            sort=[('started_at', DESCENDING)]
+        )
+
 # Instantiate the database connection
 db_client = Database()
\ No newline at end of file
@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from tqdm import tqdm
+from .settings import settings
+from .database import db_client
+from .documents import build_movie_document, providers_from_details
+from .async_tmdb_client import AsyncTMDBClient
+
+# Name of the high-water mark in the 'sync_state' collection
+CHANGES_FEED = 'movie_changes'
+# Changed movies refreshed and written per batch
+DELTA_BATCH_SIZE = 100
+
+def _change_windows(since: datetime, until: datetime):
+    """Splits [since, until] into consecutive (start_date, end_date) windows TMDB's changes feed accepts."""
+    window_start = since
+    while window_start < until:
+        window_end = min(window_start + timedelta(days=settings.TMDB_CHANGES_MAX_DAYS), until)
+        yield window_start.strftime('%Y-%m-%d'), window_end.strftime('%Y-%m-%d')
+        window_start = window_end
+
+async def _fetch_changed_movie_ids(client: AsyncTMDBClient, since: datetime, until: datetime) -> set:
+    """Collects the IDs of every movie TMDB reports as changed between the two timestamps."""
+    changed_ids = set()
+    for start_date, end_date in _change_windows(since, until):
+        first_page = await client.fetch_changed_movies_page(start_date, end_date, 1)
+        pages = [first_page] + await asyncio.gather(*(
+            client.fetch_changed_movies_page(start_date, end_date, page)
+            for page in range(2, first_page.get('total_pages', 0) + 1)
+        ))
+        for data in pages:
+            changed_ids.update(change['id'] for change in data.get('results', []) if change.get('id'))
+    return changed_ids
+
+async def _refresh_movies(client: AsyncTMDBClient, movie_ids: list, genre_map: dict) -> int:
+    """Re-fetches the given movies (details plus providers) and upserts them. Returns the number written."""
+    written = 0
+    with tqdm(total=len(movie_ids), desc="Refreshing changed movies", unit="movie") as progress:
+        for start in range(0, len(movie_ids), DELTA_BATCH_SIZE):
+            batch = movie_ids[start:start + DELTA_BATCH_SIZE]
+            details = await asyncio.gather(*(client.fetch_movie_details(movie_id) for movie_id in batch))
+            movie_documents = [
+                build_movie_document(movie_details, genre_map, providers_from_details(movie_details))
+                for movie_details in details if movie_details.get('id')
+            ]
+            await asyncio.to_thread(db_client.bulk_upsert_movies, movie_documents)
+            written += len(movie_documents)
+            progress.update(len(batch))
+    return written
+
+async def run_delta_ingestion():
+    """
+    Incremental ingestion driven by TMDB's /movie/changes feed.
+    Reads the IDs changed since the last successful sync and re-fetches only those that are already
+    in the catalog; new titles still arrive through the full discover runs. The high-water mark
+    advances only when the whole delta has been written.
+    """
+    print("🚀 Starting Delta Content Ingestion...")
+    sync_started_at = datetime.now(timezone.utc)
+    client = AsyncTMDBClient()
+
+    try:
+        since = db_client.get_high_water_mark(CHANGES_FEED)
+        if since is None:
+            since = sync_started_at - timedelta(days=settings.TMDB_CHANGES_MAX_DAYS)
+            print(f"No previous sync recorded; reading the last {settings.TMDB_CHANGES_MAX_DAYS} days of changes.")
+        elif since.tzinfo is None:
+            # pymongo returns naive UTC datetimes
+            since = since.replace(tzinfo=timezone.utc)
+
+        async with client:
+            genre_map, genres_to_store = await client.fetch_genres()
+            if not genre_map:
+                print("❌ Could not fetch genres. Aborting ingestion.")
+                return
+            db_client.upsert_genres(genres_to_store)
+
+            print(f"Reading TMDB changes since {since.isoformat()}...")
+            changed_ids = await _fetch_changed_movie_ids(client, since, sync_started_at)
+            movie_ids = sorted(db_client.find_existing_movie_ids(changed_ids))
+            print(f"{len(changed_ids)} movies changed on TMDB, {len(movie_ids)} of them are in the catalog.")
+
+            written = await _refresh_movies(client, movie_ids, genre_map)
+
+        db_client.set_high_water_mark(CHANGES_FEED, sync_started_at)
+        print(f"\n✅ Delta Ingestion Complete! Refreshed {written} movies.")
+
+    except Exception as e:
+        print(f"\n❌ An unexpected error occurred during delta ingestion: {e}")
+    finally:
+        print(f"TMDB request stats: {client.stats}")
+        db_client.close()
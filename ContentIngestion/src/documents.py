@@ -0,0 +1,93 @@
+import hashlib
+import json
+import unicodedata
+from .settings import settings
+
+# Offer types TMDB groups a region's watch providers under
+WATCH_PROVIDER_TYPES = ('flatrate', 'rent', 'buy', 'free', 'ads')
+
+def _genre_ids(movie_data: dict) -> list:
+    """Discover results carry 'genre_ids'; full movie details carry 'genres' as {id, name} objects."""
+    if 'genre_ids' in movie_data:
+        return movie_data['genre_ids']
+    return [genre['id'] for genre in movie_data.get('genres', [])]
+
+def _catalog_fields(movie_data: dict, genre_map: dict) -> dict:
+    """The fields of a movie document that come from the movie itself (everything but providers)."""
+    return {
+        'title': movie_data.get('title'),
+        'overview': movie_data.get('overview'),
+        'release_date': movie_data.get('release_date'),
+        'poster_path': movie_data.get('poster_path'),
+        'vote_average': movie_data.get('vote_average'),
+        'genres': [genre_map.get(gid) for gid in _genre_ids(movie_data) if gid in genre_map]
+    }
+
+def title_key(title: str) -> str:
+    """
+    Case- and accent-insensitive form of a movie title, stored as 'title_key' for exact title lookups
+    ('Amélie ' -> 'amelie'). Must match ContentSearchService's titles.title_key.
+    """
+    if not title:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", title)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+def _hash_fields(fields: dict) -> str:
+    canonical = json.dumps(fields, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+def movie_content_hash(movie_data: dict, genre_map: dict) -> str:
+    """Stable hash of a movie's catalog fields, stored on the document as 'content_hash'."""
+    return _hash_fields(_catalog_fields(movie_data, genre_map))
+
+def build_movie_document(movie_data: dict, genre_map: dict, providers: dict) -> dict:
+    """
+    Assembles the MongoDB document for a single TMDB movie.
+    Shared by every ingestion mode so they all write identical documents.
+    The region's providers ride along as 'watch_providers'; Database.bulk_upsert_movies moves them
+    into the watch_providers collection instead of storing them on the movie.
+    """
+    fields = _catalog_fields(movie_data, genre_map)
+    return {
+        '_id': movie_data.get('id'),
+        **fields,
+        'title_key': title_key(fields['title']),
+        'watch_providers': providers,
+        'content_hash': _hash_fields(fields)
+    }
+
+def movies_needing_update(movies_on_page: list, genre_map: dict, stored_hashes: dict) -> list:
+    """
+    Movies from a discover page that are new or whose catalog fields changed since they were stored.
+    Unchanged movies skip both the watch provider lookup and the write.
+    """
+    return [
+        movie_data for movie_data in movies_on_page
+        if movie_data.get('id') and stored_hashes.get(movie_data['id']) != movie_content_hash(movie_data, genre_map)
+    ]
+
+def providers_from_details(movie_details: dict) -> dict:
+    """Extracts the WATCH_PROVIDER_REGION providers from a details response fetched with append_to_response."""
+    return movie_details.get('watch/providers', {}).get('results', {}).get(settings.WATCH_PROVIDER_REGION, {})
+
+def watch_provider_row(movie_id: int, region: str, providers: dict) -> tuple:
+    """
+    Splits one region's TMDB watch providers into a compact row of the watch_providers collection,
+    which only references providers by ID, and the {provider_id: {name, logo_path}} details it references.
+    A row without offer lists records that the movie has no providers in that region.
+    """
+    row = {'_id': f"{movie_id}:{region}", 'movie_id': movie_id, 'region': region}
+    if providers.get('link'):
+        row['link'] = providers['link']
+    referenced = {}
+    for offer_type in WATCH_PROVIDER_TYPES:
+        entries = [entry for entry in providers.get(offer_type) or [] if entry.get('provider_id') is not None]
+        if not entries:
+            continue
+        # TMDB already lists providers by display priority, so the order of the IDs keeps it
+        row[offer_type] = [entry['provider_id'] for entry in entries]
+        for entry in entries:
+            referenced[entry['provider_id']] = {'name': entry.get('provider_name'), 'logo_path': entry.get('logo_path')}
+    return row, referenced
@@ -0,0 +1,90 @@
+import argparse
+import hashlib
+from sentence_transformers import SentenceTransformer
+from supabase import create_client
+from tqdm import tqdm
+from .settings import settings
+from .database import db_client
+
+def _embedding_text(movie: dict) -> str:
+    """The text embedded for a movie: its title followed by its overview."""
+    return f"{movie.get('title') or ''}. {movie.get('overview') or ''}".strip()
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def _knowledge_base_row(movie: dict, embedding) -> dict:
+    """Shapes a Mongo movie into a row of the movie KB table queried by the match_movies RPC."""
+    release_date = movie.get('release_date') or ''
+    return {
+        'tmdbid': movie['_id'],
+        'title': movie.get('title'),
+        'overview': movie.get('overview'),
+        'release_year': int(release_date[:4]) if release_date[:4].isdigit() else None,
+        'vote_average': movie.get('vote_average'),
+        'genres': movie.get('genres', []),
+        'poster_path': movie.get('poster_path'),
+        'embedding': embedding.tolist()
+    }
+
+def run_embedding_backfill(force: bool = False):
+    """
+    Builds the vectors of the movie knowledge base from the movies stored in Mongo.
+    Title and overview are encoded with the same model the AI service queries with, EMBEDDING_CHUNK_SIZE
+    movies at a time, and each chunk is bulk-upserted into the KB table. A movie's text hash is recorded
+    in Mongo once its vector is stored, so an interrupted backfill resumes where it stopped and later runs
+    only re-encode movies whose text changed (force=True re-encodes everything).
+    """
+    print("🚀 Starting Movie Knowledge Base Embedding Backfill...")
+
+    try:
+        if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
+            print("❌ SUPABASE_URL and SUPABASE_KEY must be configured. Aborting backfill.")
+            return
+
+        pending = []
+        unchanged = 0
+        for movie in db_client.iter_movies_for_embedding():
+            text = _embedding_text(movie)
+            text_hash = _text_hash(text)
+            if not force and movie.get('embedding_text_hash') == text_hash:
+                unchanged += 1
+                continue
+            pending.append((movie, text, text_hash))
+        print(f"{len(pending)} movies need embeddings, {unchanged} are up to date.")
+        if not pending:
+            print("\n✅ Knowledge base already up to date!")
+            return
+
+        model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
+        knowledge_base = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY).table(settings.SUPABASE_MOVIES_TABLE)
+
+        with tqdm(total=len(pending), desc="Embedding movies", unit="movie") as progress:
+            for start in range(0, len(pending), settings.EMBEDDING_CHUNK_SIZE):
+                chunk = pending[start:start + settings.EMBEDDING_CHUNK_SIZE]
+                embeddings = model.encode(
+                    [text for _, text, _ in chunk],
+                    batch_size=settings.EMBEDDING_BATCH_SIZE,
+                    show_progress_bar=False
+                )
+                rows = [_knowledge_base_row(movie, embedding) for (movie, _, _), embedding in zip(chunk, embeddings)]
+                knowledge_base.upsert(rows, on_conflict='tmdbid').execute()
+                # Only mark the chunk done once its vectors are stored
+                db_client.set_embedding_text_hashes({movie['_id']: text_hash for movie, _, text_hash in chunk})
+                progress.update(len(chunk))
+
+        print("\n✅ Embedding Backfill Complete!")
+
+    except Exception as e:
+        print(f"\n❌ An unexpected error occurred during the embedding backfill: {e}")
+    finally:
+        db_client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Build movie knowledge base embeddings from MongoDB.")
+    parser.add_argument("--force", action="store_true", help="Re-encode every movie, even if its text is unchanged.")
+    args = parser.parse_args()
+    run_embedding_backfill(force=args.force)
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,41 @@
+import argparse
+import asyncio
 from tqdm import tqdm
 from .settings import settings
 from .database import db_client
+from .documents import build_movie_document, movies_needing_update
+from .checkpoint import IngestionCheckpoint
 from .tmdb_client import tmdb_client
+from .tmdb_archive import tmdb_archive
+from .async_tmdb_client import AsyncTMDBClient
+from .pipeline import IngestionPipeline
+from .delta import CHANGES_FEED, run_delta_ingestion
 
-def run_ingestion():
+def _pages_for(first_page: dict) -> int:
+    """Number of discover pages to walk for a year, as reported by TMDB (capped at TMDB's hard limit)."""
+    return min(first_page.get('total_pages', 0), settings.TMDB_MAX_PAGES)
+
+def _movie_ids(movies_on_page: list) -> list:
+    return [movie_data['id'] for movie_data in movies_on_page if movie_data.get('id')]
+
+def _open_checkpoint(mode: str, resume: bool, run_id: str = None):
+    """Starts a new checkpointed run, or loads the one to resume (None if there is none)."""
+    if not resume:
+        return IngestionCheckpoint.start(mode)
+    checkpoint = IngestionCheckpoint.resume(run_id)
+    if checkpoint is None:
+        print("❌ No unfinished ingestion run to resume.")
+    return checkpoint
+
+def run_ingestion(resume: bool = False, run_id: str = None):
     """
     The main orchestration function for the ingestion process.
     It fetches data year by year and page by page, then bulk-inserts into MongoDB.
+    Progress is checkpointed after every page; with resume=True the latest unfinished run
+    (or `run_id`) continues from its checkpoint instead of starting over.
     """
     print("🚀 Starting Content Ingestion Process...")
+    checkpoint = None
 
     try:
         # 1. Fetch and store genres first to create a local map
@@ -19,51 +46,206 @@ def run_ingestion():
             return
         db_client.upsert_genres(genres_to_store)
 
+        checkpoint = _open_checkpoint("sync", resume, run_id)
+        if checkpoint is None:
+            return
+
         # 2. Loop through each year and ingest movies
-        for year in range(settings.START_YEAR, settings.END_YEAR + 1):
+        for year in checkpoint.years():
             print(f"\n--- Processing Year: {year} ---")
-            
-            # Fetch a limited number of pages for demonstration (e.g., 50 pages of ~20 movies each)
-            # For a full run, you would loop through all available pages.
-            pages_to_process = 50 
-            
-            for page in tqdm(range(1, pages_to_process + 1), desc=f"Ingesting {year}", unit="page"):
-                movies_on_page = tmdb_client.discover_movies_by_year(year, page)
+            checkpoint.enter_year(year)
+
+            # The first page tells us how many pages TMDB has for this year
+            first_page = tmdb_client.discover_movies_page(year, 1)
+            pages_to_process = _pages_for(first_page)
+
+            for page in tqdm(range(checkpoint.page + 1, pages_to_process + 1), desc=f"Ingesting {year}", unit="page"):
+                if page == 1:
+                    movies_on_page = first_page.get('results', [])
+                else:
+                    movies_on_page = tmdb_client.discover_movies_by_year(year, page)
                 if not movies_on_page:
                     break # Stop if a page has no movies
 
+                # Movies whose stored content hash still matches need neither providers nor a write
+                stored_hashes = db_client.fetch_content_hashes(_movie_ids(movies_on_page))
                 movie_documents = []
-                for movie_data in movies_on_page:
-                    movie_id = movie_data.get('id')
-                    if not movie_id:
+                for movie_data in movies_needing_update(movies_on_page, genre_map, stored_hashes):
+                    movie_id = movie_data['id']
+                    if checkpoint.is_completed(movie_id):
                         continue
 
                     # Fetch watch providers for each movie
                     providers = tmdb_client.fetch_watch_providers(movie_id)
-                    
-                    # Assemble the final document for MongoDB
-                    document = {
-                        '_id': movie_id,
-                        'title': movie_data.get('title'),
-                        'overview': movie_data.get('overview'),
-                        'release_date': movie_data.get('release_date'),
-                        'poster_path': movie_data.get('poster_path'),
-                        'vote_average': movie_data.get('vote_average'),
-                        'genres': [genre_map.get(gid) for gid in movie_data.get('genre_ids', []) if gid in genre_map],
-                        'watch_providers': providers
-                    }
-                    movie_documents.append(document)
+                    movie_documents.append(build_movie_document(movie_data, genre_map, providers))
 
                 # Perform a single bulk write operation for the entire page
                 db_client.bulk_upsert_movies(movie_documents)
-        
+                checkpoint.mark_page_done(page, _movie_ids(movies_on_page))
+
+        checkpoint.finish('completed')
+        # A full scan only covers START_YEAR..END_YEAR, so it must not advance an existing mark past
+        # changes to catalog movies outside that range; it just gives the first delta sync a starting point
+        db_client.initialize_high_water_mark(CHANGES_FEED, checkpoint.started_at)
         print("\n✅ Ingestion Complete!")
 
     except Exception as e:
         print(f"\n❌ An unexpected error occurred during ingestion: {e}")
+        if checkpoint is not None:
+            checkpoint.finish('failed')
+            print(f"Resume with: python -m src.ingest --resume {checkpoint.run_id}")
     finally:
         # 3. Always ensure the database connection is closed
+        print(f"TMDB request stats: {tmdb_client.stats}")
+        db_client.close()
+
+async def _ingest_page_async(client: AsyncTMDBClient, movies_on_page: list, genre_map: dict, checkpoint: IngestionCheckpoint):
+    """Fetches watch providers for every new or changed movie on a page in parallel, then bulk-writes them."""
+    stored_hashes = await asyncio.to_thread(db_client.fetch_content_hashes, _movie_ids(movies_on_page))
+    movies = [
+        movie_data for movie_data in movies_needing_update(movies_on_page, genre_map, stored_hashes)
+        if not checkpoint.is_completed(movie_data['id'])
+    ]
+    providers = await asyncio.gather(*(client.fetch_watch_providers(movie_data['id']) for movie_data in movies))
+    movie_documents = [
+        build_movie_document(movie_data, genre_map, movie_providers)
+        for movie_data, movie_providers in zip(movies, providers)
+    ]
+    # pymongo is blocking, so run the write in a worker thread to keep other pages fetching
+    await asyncio.to_thread(db_client.bulk_upsert_movies, movie_documents)
+
+async def _ingest_year_async(client: AsyncTMDBClient, year: int, genre_map: dict, checkpoint: IngestionCheckpoint):
+    """Ingests every discover page of a year, processing up to INGEST_PAGE_CONCURRENCY pages at once."""
+    first_page = await client.discover_movies_page(year, 1)
+    pages = range(checkpoint.page + 1, _pages_for(first_page) + 1)
+    page_slots = asyncio.Semaphore(settings.INGEST_PAGE_CONCURRENCY)
+    # The checkpoint write is blocking pymongo, so it runs in a worker thread, one page at a time
+    checkpoint_lock = asyncio.Lock()
+
+    with tqdm(total=len(pages), desc=f"Ingesting {year}", unit="page") as progress:
+        async def process_page(page: int):
+            async with page_slots:
+                if page == 1:
+                    movies_on_page = first_page.get('results', [])
+                else:
+                    movies_on_page = await client.discover_movies_by_year(year, page)
+                if movies_on_page:
+                    await _ingest_page_async(client, movies_on_page, genre_map, checkpoint)
+                async with checkpoint_lock:
+                    await asyncio.to_thread(checkpoint.mark_page_done, page, _movie_ids(movies_on_page))
+                progress.update(1)
+
+        tasks = [asyncio.create_task(process_page(page)) for page in pages]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # After the first failure the other pages must stop fetching and checkpointing too
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+async def _ingest_year_staged(pipeline: IngestionPipeline, year: int):
+    """Runs every remaining discover page of a year through the staged pipeline."""
+    first_page = await pipeline.client.discover_movies_page(year, 1)
+    pages = range(pipeline.checkpoint.page + 1, _pages_for(first_page) + 1)
+    with tqdm(total=len(pages), desc=f"Ingesting {year}", unit="page") as progress:
+        await pipeline.run(year, first_page, pages, progress)
+
+async def run_ingestion_async(resume: bool = False, run_id: str = None, staged: bool = False):
+    """
+    Concurrent variant of run_ingestion.
+    Pages of a year and the per-movie watch provider lookups are fetched in parallel over a
+    shared connection pool, capped at INGEST_CONCURRENCY in-flight requests.
+    With staged=True the pages flow through IngestionPipeline instead, so fetching overlaps with
+    batched, unordered Mongo writes.
+    Writes the same documents and checkpoints as run_ingestion.
+    """
+    mode = "pipeline" if staged else "async"
+    print(f"🚀 Starting {'Staged' if staged else 'Async'} Content Ingestion Process...")
+    client = AsyncTMDBClient()
+    checkpoint = None
+    pipeline = None
+
+    try:
+        async with client:
+            print("Fetching genre map from TMDB...")
+            genre_map, genres_to_store = await client.fetch_genres()
+            if not genre_map:
+                print("❌ Could not fetch genres. Aborting ingestion.")
+                return
+            db_client.upsert_genres(genres_to_store)
+
+            checkpoint = _open_checkpoint(mode, resume, run_id)
+            if checkpoint is None:
+                return
+            if staged:
+                pipeline = IngestionPipeline(client, genre_map, checkpoint)
+
+            for year in checkpoint.years():
+                print(f"\n--- Processing Year: {year} ---")
+                checkpoint.enter_year(year)
+                if staged:
+                    await _ingest_year_staged(pipeline, year)
+                else:
+                    await _ingest_year_async(client, year, genre_map, checkpoint)
+
+        checkpoint.finish('completed')
+        # A full scan only covers START_YEAR..END_YEAR, so it must not advance an existing mark past
+        # changes to catalog movies outside that range; it just gives the first delta sync a starting point
+        db_client.initialize_high_water_mark(CHANGES_FEED, checkpoint.started_at)
+        print("\n✅ Ingestion Complete!")
+
+    except Exception as e:
+        print(f"\n❌ An unexpected error occurred during ingestion: {e}")
+        if checkpoint is not None:
+            checkpoint.finish('failed')
+            print(f"Resume with: python -m src.ingest --mode {mode} --resume {checkpoint.run_id}")
+    finally:
+        if pipeline is not None:
+            print("Pipeline stage throughput:")
+            pipeline.report()
+        print(f"TMDB request stats: {client.stats}")
         db_client.close()
 
+def main():
+    parser = argparse.ArgumentParser(description="Ingest TMDB movies into MongoDB.")
+    parser.add_argument(
+        "--mode", choices=["sync", "async", "pipeline", "delta"], default="sync",
+        help="'sync' walks pages one request at a time; 'async' fetches pages and providers concurrently; "
+             "'pipeline' additionally overlaps fetching with batched bulk writes; "
+             "'delta' refreshes only the movies TMDB reports as changed since the last sync."
+    )
+    parser.add_argument(
+        "--resume", nargs="?", const="", default=None, metavar="RUN_ID",
+        help="Continue an interrupted run from its checkpoint (the latest unfinished run if RUN_ID is omitted)."
+    )
+    archive = parser.add_mutually_exclusive_group()
+    archive.add_argument(
+        "--record", metavar="PATH",
+        help="Append every TMDB response to a gzip JSONL archive at PATH."
+    )
+    archive.add_argument(
+        "--replay", metavar="PATH",
+        help="Serve every TMDB request from the archive at PATH, without network access."
+    )
+    args = parser.parse_args()
+    resume = args.resume is not None
+    run_id = args.resume or None
+
+    if args.replay:
+        tmdb_archive.replay_from(args.replay)
+    elif args.record:
+        tmdb_archive.record_to(args.record)
+
+    try:
+        if args.mode == "delta":
+            asyncio.run(run_delta_ingestion())
+        elif args.mode in ("async", "pipeline"):
+            asyncio.run(run_ingestion_async(resume, run_id, staged=args.mode == "pipeline"))
+        else:
+            run_ingestion(resume, run_id)
+    finally:
+        tmdb_archive.close()
+
 if __name__ == "__main__":
-    run_ingestion()
\ No newline at end of file
+    main()
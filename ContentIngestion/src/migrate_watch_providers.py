@@ -0,0 +1,50 @@
+from .settings import settings
+from .database import db_client
+from .documents import WATCH_PROVIDER_TYPES, watch_provider_row
+
+MIGRATION_BATCH_SIZE = 500
+
+def _regions_of(embedded: dict) -> dict:
+    """
+    Ingestion embedded a single region's providers ({link, flatrate, ...}), while the content service
+    embedded TMDB's full {region: providers} map; returns the blob as a {region: providers} map either way.
+    """
+    if not embedded or 'link' in embedded or any(offer_type in embedded for offer_type in WATCH_PROVIDER_TYPES):
+        return {settings.WATCH_PROVIDER_REGION: embedded or {}}
+    return embedded
+
+def run_watch_provider_migration():
+    """
+    Moves watch providers still embedded in movie documents into the watch_providers and
+    providers collections, then removes the embedded copies. Safe to run more than once.
+    """
+    print("🚀 Moving embedded watch providers out of movie documents...")
+    migrated = 0
+    rows, providers, movie_ids = [], {}, []
+
+    def flush():
+        db_client.upsert_watch_providers(rows, providers)
+        db_client.unset_embedded_watch_providers(movie_ids)
+        rows.clear()
+        providers.clear()
+        movie_ids.clear()
+
+    try:
+        for movie in db_client.iter_embedded_watch_providers():
+            for region, region_providers in _regions_of(movie.get('watch_providers')).items():
+                row, referenced = watch_provider_row(movie['_id'], region, region_providers or {})
+                rows.append(row)
+                providers.update(referenced)
+            movie_ids.append(movie['_id'])
+            migrated += 1
+            if len(movie_ids) >= MIGRATION_BATCH_SIZE:
+                flush()
+        flush()
+        print(f"\n✅ Moved watch providers of {migrated} movies.")
+    except Exception as e:
+        print(f"\n❌ Watch provider migration failed after {migrated} movies: {e}")
+    finally:
+        db_client.close()
+
+if __name__ == "__main__":
+    run_watch_provider_migration()
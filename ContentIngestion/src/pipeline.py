@@ -0,0 +1,167 @@
+import asyncio
+import time
+from collections import namedtuple
+from .settings import settings
+from .database import db_client
+from .documents import build_movie_document, movies_needing_update
+from .checkpoint import IngestionCheckpoint
+from .async_tmdb_client import AsyncTMDBClient
+
+# One discover page travelling through the pipeline. `movie_ids` lists every movie on the page
+# (for the checkpoint); `movies` holds (movie_data, providers) pairs after the fetch stage and
+# documents after the transform stage.
+PageBatch = namedtuple('PageBatch', ['page', 'movie_ids', 'movies'])
+
+# Marks the end of a stage's output
+_DONE = object()
+
+class StageStats:
+    """Throughput counters for one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.blocked_seconds = 0.0
+        self.flushes = 0
+        self.write_seconds = 0.0
+        self._started = None
+        self._elapsed = 0.0
+
+    def start(self):
+        self._started = time.perf_counter()
+
+    def stop(self):
+        self._elapsed += time.perf_counter() - self._started
+
+    def __str__(self):
+        rate = self.items / self._elapsed if self._elapsed else 0.0
+        line = f"{self.name}: {self.items} movies in {self._elapsed:.1f}s ({rate:.1f} movies/s)"
+        if self.flushes:
+            return line + f", {self.flushes} bulk writes taking {self.write_seconds:.1f}s"
+        return line + f", {self.blocked_seconds:.1f}s blocked on a full queue"
+
+class IngestionPipeline:
+    """
+    Ingests discover pages through three concurrent stages joined by bounded queues:
+    fetch (discover pages, plus watch providers for new or changed movies), transform (document assembly) and write
+    (unordered bulk upserts, flushed every WRITE_BATCH_SIZE documents or WRITE_FLUSH_INTERVAL seconds).
+    A full queue blocks the stage feeding it, so fetching never runs far ahead of Mongo.
+    Pages are checkpointed once their documents have been flushed.
+    """
+
+    def __init__(self, client: AsyncTMDBClient, genre_map: dict, checkpoint: IngestionCheckpoint):
+        self.client = client
+        self.genre_map = genre_map
+        self.checkpoint = checkpoint
+        self.fetch_stats = StageStats('fetch')
+        self.transform_stats = StageStats('transform')
+        self.write_stats = StageStats('write')
+        self._progress = None
+
+    async def run(self, year: int, first_page: dict, pages: range, progress=None):
+        """Runs the given pages of `year` through the pipeline and waits until all are written."""
+        self._progress = progress
+        fetched = asyncio.Queue(maxsize=settings.PIPELINE_QUEUE_SIZE)
+        transformed = asyncio.Queue(maxsize=settings.PIPELINE_QUEUE_SIZE)
+        remaining_pages = iter(pages)
+
+        fetchers = [
+            asyncio.create_task(self._fetch(year, first_page, remaining_pages, fetched))
+            for _ in range(settings.INGEST_PAGE_CONCURRENCY)
+        ]
+
+        async def close_fetch_stage():
+            self.fetch_stats.start()
+            await asyncio.gather(*fetchers)
+            self.fetch_stats.stop()
+            await fetched.put(_DONE)
+
+        tasks = fetchers + [
+            asyncio.create_task(close_fetch_stage()),
+            asyncio.create_task(self._transform(fetched, transformed)),
+            asyncio.create_task(self._write(transformed))
+        ]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            task.result() # Re-raises the first stage failure, if any
+
+    def report(self):
+        """Prints the throughput of every stage."""
+        for stats in (self.fetch_stats, self.transform_stats, self.write_stats):
+            print(f"  {stats}")
+
+    async def _put(self, queue: asyncio.Queue, item, stats: StageStats):
+        started = time.perf_counter()
+        await queue.put(item)
+        stats.blocked_seconds += time.perf_counter() - started
+
+    async def _fetch(self, year: int, first_page: dict, remaining_pages, outbox: asyncio.Queue):
+        # All fetch workers share `remaining_pages`, so each page is taken exactly once
+        for page in remaining_pages:
+            if page == 1:
+                movies_on_page = first_page.get('results', [])
+            else:
+                movies_on_page = await self.client.discover_movies_by_year(year, page)
+            movie_ids = [movie_data['id'] for movie_data in movies_on_page if movie_data.get('id')]
+            stored_hashes = await asyncio.to_thread(db_client.fetch_content_hashes, movie_ids)
+            movies = [
+                movie_data for movie_data in movies_needing_update(movies_on_page, self.genre_map, stored_hashes)
+                if not self.checkpoint.is_completed(movie_data['id'])
+            ]
+            providers = await asyncio.gather(*(self.client.fetch_watch_providers(movie_data['id']) for movie_data in movies))
+            self.fetch_stats.items += len(movies)
+            await self._put(outbox, PageBatch(page, movie_ids, list(zip(movies, providers))), self.fetch_stats)
+
+    async def _transform(self, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        self.transform_stats.start()
+        while (batch := await inbox.get()) is not _DONE:
+            movie_documents = [
+                build_movie_document(movie_data, self.genre_map, providers)
+                for movie_data, providers in batch.movies
+            ]
+            self.transform_stats.items += len(movie_documents)
+            await self._put(outbox, batch._replace(movies=movie_documents), self.transform_stats)
+        self.transform_stats.stop()
+        await outbox.put(_DONE)
+
+    async def _write(self, inbox: asyncio.Queue):
+        self.write_stats.start()
+        loop = asyncio.get_running_loop()
+        buffered, buffered_documents = [], 0
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                batch = await asyncio.wait_for(inbox.get(), timeout)
+            except asyncio.TimeoutError:
+                # Flush interval elapsed since the oldest buffered page
+                await self._flush(buffered)
+                buffered, buffered_documents, deadline = [], 0, None
+                continue
+            if batch is _DONE:
+                break
+            if deadline is None:
+                deadline = loop.time() + settings.WRITE_FLUSH_INTERVAL
+            buffered.append(batch)
+            buffered_documents += len(batch.movies)
+            if buffered_documents >= settings.WRITE_BATCH_SIZE:
+                await self._flush(buffered)
+                buffered, buffered_documents, deadline = [], 0, None
+        await self._flush(buffered)
+        self.write_stats.stop()
+
+    async def _flush(self, batches: list):
+        """Writes the buffered pages as one unordered bulk write, then checkpoints them."""
+        if not batches:
+            return
+        movie_documents = [document for batch in batches for document in batch.movies]
+        started = time.perf_counter()
+        await asyncio.to_thread(db_client.bulk_upsert_movies, movie_documents, False)
+        self.write_stats.write_seconds += time.perf_counter() - started
+        self.write_stats.flushes += 1
+        self.write_stats.items += len(movie_documents)
+        self.checkpoint.mark_pages_done({batch.page: batch.movie_ids for batch in batches})
+        if self._progress is not None:
+            self._progress.update(len(batches))
@@ -0,0 +1,120 @@
+import math
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from .settings import settings
+
+# Responses worth retrying: throttling and transient server-side failures.
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# Most recent round-trip latencies kept for the percentiles
+LATENCY_WINDOW = 10000
+
+class TokenBucket:
+    """
+    A thread-safe token bucket shared by every TMDB request in the process.
+    Callers reserve a token and sleep for the returned delay (time.sleep or asyncio.sleep),
+    so the same bucket paces both the sync and the async client.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes one token and returns how many seconds the caller must wait before sending."""
+        with self._lock:
+            now = time.monotonic()
+            # During a pause _updated lies in the future: nothing refills until then
+            if now > self._updated:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            self._tokens -= 1
+            wait = (self._updated - now) + (-self._tokens / self.rate if self._tokens < 0 else 0.0)
+            return max(wait, self._blocked_until - now)
+
+    def pause(self, seconds: float):
+        """
+        Holds back every caller for `seconds`, e.g. after TMDB answers 429 with Retry-After.
+        The bucket restarts empty when the pause ends, so waiting callers resume one token at a time
+        instead of all at once.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = max(self._updated, self._blocked_until)
+
+class RequestStats:
+    """Thread-safe counters describing how TMDB requests went, plus the latencies of the last LATENCY_WINDOW HTTP round trips."""
+
+    def __init__(self):
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self.failures = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_latency(self, seconds: float):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def latency_percentile(self, percentile: float) -> float:
+        """Nearest-rank percentile of the recorded latencies, in seconds (0.0 if none were recorded)."""
+        with self._lock:
+            latencies = sorted(self.latencies)
+        if not latencies:
+            return 0.0
+        rank = max(1, math.ceil(percentile / 100 * len(latencies)))
+        return latencies[rank - 1]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'retries': self.retries,
+                'failures': self.failures
+            }
+
+    def __str__(self):
+        stats = self.snapshot()
+        return ", ".join(f"{name}={value}" for name, value in stats.items())
+
+def parse_retry_after(value: str):
+    """Parses a Retry-After header (delta-seconds or HTTP-date) into seconds, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def backoff_delay(attempt: int, retry_after: float = None) -> float:
+    """
+    Seconds to wait before retry number `attempt` (0-based).
+    Honors the server's Retry-After when given, otherwise uses full-jitter exponential backoff.
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, settings.TMDB_BACKOFF_BASE)
+    return random.uniform(0, min(settings.TMDB_BACKOFF_MAX, settings.TMDB_BACKOFF_BASE * 2 ** attempt))
+
+# One limiter and one set of counters for the whole process, shared by the sync and async TMDB clients
+tmdb_rate_limiter = TokenBucket(settings.TMDB_RATE_LIMIT, settings.TMDB_RATE_BURST)
+tmdb_request_stats = RequestStats()
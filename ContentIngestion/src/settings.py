@@ -12,10 +12,53 @@ class Settings:
     TMDB_API_KEY: str = os.getenv("TMDB_API_KEY")
     TMDB_READ_ACCESS_TOKEN: str = os.getenv("TMDB_READ_ACCESS_TOKEN")
     
-    # Static configuration
-    TMDB_API_URL: str = "https://api.themoviedb.org/3"
-    START_YEAR: int = 2023
-    END_YEAR: int = 2025
+    # Static configuration (overridable, e.g. to point the benchmarks at a local fake TMDB)
+    TMDB_API_URL: str = os.getenv("TMDB_API_URL", "https://api.themoviedb.org/3")
+    START_YEAR: int = int(os.getenv("START_YEAR", 2023))
+    END_YEAR: int = int(os.getenv("END_YEAR", 2025))
+    # TMDB refuses /discover pages beyond 500, whatever total_pages says.
+    TMDB_MAX_PAGES: int = 500
+    # /movie/changes only accepts windows of up to 14 days.
+    TMDB_CHANGES_MAX_DAYS: int = 14
+    # Region whose watch providers are stored on each movie.
+    WATCH_PROVIDER_REGION: str = "IN"
+
+    # --- TMDB request policy ---
+    # Client-side rate limit in requests/second, with bursts of up to TMDB_RATE_BURST requests.
+    TMDB_RATE_LIMIT: float = float(os.getenv("TMDB_RATE_LIMIT", 40))
+    TMDB_RATE_BURST: int = int(os.getenv("TMDB_RATE_BURST", 20))
+    TMDB_TIMEOUT: float = float(os.getenv("TMDB_TIMEOUT", 10))
+    TMDB_MAX_RETRIES: int = int(os.getenv("TMDB_MAX_RETRIES", 5))
+    TMDB_BACKOFF_BASE: float = 0.5
+    TMDB_BACKOFF_MAX: float = 30.0
+
+    # --- Record/replay ---
+    # Append every TMDB response to this gzip JSONL archive, or serve all requests from it instead of the network.
+    TMDB_RECORD_PATH: str = os.getenv("TMDB_RECORD_PATH")
+    TMDB_REPLAY_PATH: str = os.getenv("TMDB_REPLAY_PATH")
+
+    # --- Async ingestion ---
+    # Maximum number of TMDB requests in flight (also the size of the connection pool).
+    INGEST_CONCURRENCY: int = int(os.getenv("INGEST_CONCURRENCY", 32))
+    # Maximum number of discover pages being processed at once.
+    INGEST_PAGE_CONCURRENCY: int = int(os.getenv("INGEST_PAGE_CONCURRENCY", 8))
+
+    # --- Staged pipeline ---
+    # Capacity (in discover pages) of the queues between the fetch, transform and write stages.
+    PIPELINE_QUEUE_SIZE: int = int(os.getenv("PIPELINE_QUEUE_SIZE", 50))
+    # The writer flushes once this many documents are buffered, or WRITE_FLUSH_INTERVAL seconds after the oldest arrived.
+    WRITE_BATCH_SIZE: int = int(os.getenv("WRITE_BATCH_SIZE", 1000))
+    WRITE_FLUSH_INTERVAL: float = float(os.getenv("WRITE_FLUSH_INTERVAL", 0.5))
+
+    # --- Movie knowledge base (embedding backfill) ---
+    SUPABASE_URL: str = os.getenv("SUPABASE_URL")
+    SUPABASE_KEY: str = os.getenv("SUPABASE_KEY")
+    SUPABASE_MOVIES_TABLE: str = os.getenv("SUPABASE_MOVIES_TABLE", "movies")
+    # Must match the model the AI service embeds its queries with.
+    EMBEDDING_MODEL_NAME: str = "all-MiniLM-L6-v2"
+    # Sentences per forward pass of the model, and movies encoded and upserted per round.
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", 128))
+    EMBEDDING_CHUNK_SIZE: int = int(os.getenv("EMBEDDING_CHUNK_SIZE", 512))
 
     @staticmethod
     def validate():
@@ -0,0 +1,90 @@
+import gzip
+import json
+import threading
+from .settings import settings
+
+def _request_key(endpoint: str, params: dict = None) -> str:
+    """Identifies a request independently of parameter order and value types."""
+    normalized = {name: str(value) for name, value in (params or {}).items()}
+    return f"{endpoint}?{json.dumps(normalized, sort_keys=True)}"
+
+class TMDBArchive:
+    """
+    Record/replay store for TMDB responses, kept as gzip-compressed, append-only JSONL
+    (one {"endpoint", "params", "status", "body"} object per line).
+
+    When recording, every final response the TMDB clients receive is appended to the archive.
+    When replaying, the clients answer requests from the archive and never touch the network, which
+    makes ingestion runs reproducible and lets the transform and write path be benchmarked on its own.
+    """
+
+    def __init__(self):
+        self.mode = None
+        self.path = None
+        self.misses = 0
+        self._responses = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == 'record'
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    def record_to(self, path: str):
+        """Starts appending responses to `path`; an existing archive is extended, never truncated."""
+        self.close()
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+        self.mode, self.path = 'record', path
+        print(f"📼 Recording TMDB responses to {path}")
+
+    def replay_from(self, path: str):
+        """Loads `path` and serves every later request from it. The newest response for a request wins."""
+        self.close()
+        self._responses = {}
+        with gzip.open(path, 'rt', encoding='utf-8') as archive:
+            try:
+                for line in archive:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._responses[_request_key(entry['endpoint'], entry.get('params'))] = entry
+            except (EOFError, gzip.BadGzipFile, json.JSONDecodeError):
+                # A recording that was interrupted mid-write: keep everything before the damaged tail
+                print(f"⚠️ Archive {path} ends with a truncated entry; ignoring it.")
+        self.mode, self.path = 'replay', path
+        print(f"📼 Replaying {len(self._responses)} archived TMDB responses from {path}")
+
+    def lookup(self, endpoint: str, params: dict = None):
+        """
+        Returns the archived body for a request ({} if TMDB had answered with an error),
+        or None if the request was never recorded.
+        """
+        entry = self._responses.get(_request_key(endpoint, params))
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        return entry['body'] if entry['status'] < 400 else {}
+
+    def save(self, endpoint: str, params: dict, status: int, body: dict):
+        """Appends one response to the archive being recorded."""
+        line = json.dumps({'endpoint': endpoint, 'params': params or {}, 'status': status, 'body': body}, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self.mode = None
+
+# Shared by the sync and async TMDB clients
+tmdb_archive = TMDBArchive()
+if settings.TMDB_REPLAY_PATH:
+    tmdb_archive.replay_from(settings.TMDB_REPLAY_PATH)
+elif settings.TMDB_RECORD_PATH:
+    tmdb_archive.record_to(settings.TMDB_RECORD_PATH)
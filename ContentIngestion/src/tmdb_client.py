@@ -1,5 +1,11 @@
+import time
 import requests
 from .settings import settings
+from .rate_limit import RETRYABLE_STATUS_CODES, backoff_delay, parse_retry_after, tmdb_rate_limiter, tmdb_request_stats
+from .tmdb_archive import tmdb_archive
+
+class TMDBRequestError(Exception):
+    """Raised when a TMDB request still fails after every retry (throttling, 5xx or network errors)."""
 
 class TMDBClient:
     """A client for interacting with The Movie Database (TMDB) API."""
@@ -13,18 +19,74 @@ class TMDBClient:
         }
         if not self.access_token:
             raise ValueError("TMDB_READ_ACCESS_TOKEN is not configured.")
+        # Reuse connections across requests instead of a new TCP/TLS handshake per call
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.stats = tmdb_request_stats
         print("TMDB Client initialized with Bearer Token authentication.")
 
     def _make_request(self, endpoint: str, params: dict = None) -> dict:
-        """Helper function to make a GET request to the TMDB API using Bearer Token auth."""
-        try:
-            # The API key is no longer needed in params when using a Bearer Token
-            response = requests.get(f"{self.base_url}{endpoint}", headers=self.headers, params=params)
-            response.raise_for_status() # Raises an HTTPError for bad responses (4xx or 5xx)
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"❌ API request failed for endpoint {endpoint}: {e}")
-            return {}
+        """
+        Helper function to make a GET request to the TMDB API using Bearer Token auth.
+        Requests are paced by the shared token bucket. Throttled (429), 5xx and network failures are
+        retried with jittered exponential backoff, honoring Retry-After. Other client errors
+        (e.g. 404) return {}. Raises TMDBRequestError once retries are exhausted.
+        While tmdb_archive is recording, every final response is archived; while it is replaying,
+        requests are answered from the archive without touching the network.
+        """
+        if tmdb_archive.replaying:
+            return self._replay(endpoint, params)
+
+        url = f"{self.base_url}{endpoint}"
+        for attempt in range(settings.TMDB_MAX_RETRIES + 1):
+            time.sleep(tmdb_rate_limiter.reserve())
+            self.stats.increment('requests')
+            retry_after = None
+            throttled = False
+            try:
+                started = time.perf_counter()
+                response = self.session.get(url, params=params, timeout=settings.TMDB_TIMEOUT)
+                self.stats.record_latency(time.perf_counter() - started)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    try:
+                        response.raise_for_status() # Raises an HTTPError for bad responses (4xx or 5xx)
+                        data = response.json()
+                    except requests.exceptions.RequestException as e:
+                        print(f"❌ API request failed for endpoint {endpoint}: {e}")
+                        data = {}
+                    if tmdb_archive.recording:
+                        tmdb_archive.save(endpoint, params, response.status_code, data)
+                    return data
+                error = f"HTTP {response.status_code}"
+                throttled = response.status_code == 429
+                if throttled:
+                    self.stats.increment('throttled')
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+            if attempt == settings.TMDB_MAX_RETRIES:
+                break
+            delay = backoff_delay(attempt, retry_after)
+            self.stats.increment('retries')
+            if throttled:
+                # Hold back every in-flight request, not just this one
+                tmdb_rate_limiter.pause(delay)
+            else:
+                time.sleep(delay)
+
+        self.stats.increment('failures')
+        raise TMDBRequestError(f"TMDB request to {endpoint} failed after {settings.TMDB_MAX_RETRIES + 1} attempts: {error}")
+
+    def _replay(self, endpoint: str, params: dict = None) -> dict:
+        """Serves a request from the replay archive; an unrecorded request fails like an exhausted retry."""
+        self.stats.increment('requests')
+        data = tmdb_archive.lookup(endpoint, params)
+        if data is None:
+            self.stats.increment('failures')
+            raise TMDBRequestError(f"No archived TMDB response for {endpoint} {params or {}}")
+        return data
 
     def fetch_genres(self) -> dict:
         """Fetches the official genre list for movies."""
@@ -32,20 +94,24 @@ class TMDBClient:
         genres = data.get('genres', [])
         return {genre['id']: genre['name'] for genre in genres}, genres
 
-    def discover_movies_by_year(self, year: int, page: int) -> list:
-        """Fetches a page of movies for a specific year, sorted by popularity."""
+    def discover_movies_page(self, year: int, page: int) -> dict:
+        """Fetches a raw discover page (results plus paging info) for a specific year."""
         params = {
             'primary_release_year': year,
             'sort_by': 'popularity.desc',
             'page': page
         }
-        data = self._make_request("/discover/movie", params=params)
+        return self._make_request("/discover/movie", params=params)
+
+    def discover_movies_by_year(self, year: int, page: int) -> list:
+        """Fetches a page of movies for a specific year, sorted by popularity."""
+        data = self.discover_movies_page(year, page)
         return data.get('results', [])
 
     def fetch_watch_providers(self, movie_id: int) -> dict:
-        """Fetches watch provider information for a movie, focusing on India (IN)."""
+        """Fetches watch provider information for a movie, focusing on WATCH_PROVIDER_REGION (India by default)."""
         data = self._make_request(f"/movie/{movie_id}/watch/providers")
-        return data.get('results', {}).get('IN', {})
+        return data.get('results', {}).get(settings.WATCH_PROVIDER_REGION, {})
 
 # Instantiate the TMDB client
 tmdb_client = TMDBClient()
\ No newline at end of file
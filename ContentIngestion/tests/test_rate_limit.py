@@ -0,0 +1,93 @@
+"""Tests of the TMDB pacing helpers and document normalization; none of them needs Mongo or TMDB."""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import pytest
+from src import rate_limit
+from src.documents import movie_content_hash, movies_needing_update, title_key
+from src.rate_limit import RequestStats, TokenBucket, backoff_delay, parse_retry_after
+from src.settings import settings
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+# ---------------------------------------------------------------- token bucket
+
+def test_bucket_allows_a_burst_then_paces_at_the_rate(clock):
+    bucket = TokenBucket(rate=10, capacity=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert [round(bucket.reserve(), 3) for _ in range(2)] == [0.1, 0.2]
+
+def test_bucket_refills_over_time_up_to_capacity(clock):
+    bucket = TokenBucket(rate=10, capacity=2)
+    bucket.reserve(), bucket.reserve()
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert round(bucket.reserve(), 3) == 0.1
+
+def test_pause_holds_everyone_then_resumes_one_token_at_a_time(clock):
+    bucket = TokenBucket(rate=10, capacity=5)
+    bucket.pause(2)
+    assert [round(bucket.reserve(), 3) for _ in range(3)] == [2.1, 2.2, 2.3]
+    # Nothing refilled during the pause
+    clock.now += 1
+    assert round(bucket.reserve(), 3) == 1.4
+
+def test_pause_never_shortens_an_existing_pause(clock):
+    bucket = TokenBucket(rate=10, capacity=5)
+    bucket.pause(5)
+    bucket.pause(1)
+    assert round(bucket.reserve(), 3) == 5.1
+
+# ---------------------------------------------------------------- Retry-After and backoff
+
+def test_parse_retry_after_seconds_and_http_dates():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    in_ten_seconds = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=10), usegmt=True)
+    assert 8 <= parse_retry_after(in_ten_seconds) <= 10
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+def test_backoff_honors_retry_after_and_caps_exponential_delays():
+    assert 4.0 <= backoff_delay(0, retry_after=4.0) <= 4.0 + settings.TMDB_BACKOFF_BASE
+    for attempt in range(12):
+        assert 0 <= backoff_delay(attempt) <= min(settings.TMDB_BACKOFF_MAX, settings.TMDB_BACKOFF_BASE * 2 ** attempt)
+
+# ---------------------------------------------------------------- request stats
+
+def test_request_stats_percentiles_over_a_bounded_window():
+    stats = RequestStats()
+    for latency in range(1, 101):
+        stats.record_latency(latency / 1000)
+    assert stats.latency_percentile(50) == 0.05
+    assert stats.latency_percentile(99) == 0.099
+    for _ in range(rate_limit.LATENCY_WINDOW):
+        stats.record_latency(0.001)
+    assert len(stats.latencies) == rate_limit.LATENCY_WINDOW
+    assert stats.latency_percentile(99) == 0.001
+
+# ---------------------------------------------------------------- documents
+
+def test_title_key_folds_case_accents_and_whitespace():
+    assert title_key("  Amélie ") == "amelie"
+    assert title_key("The   Dark\tKnight") == "the dark knight"
+    assert title_key("") == ""
+
+def test_only_new_or_changed_movies_need_an_update():
+    genre_map = {28: "Action"}
+    unchanged = {"id": 1, "title": "Heat", "genre_ids": [28], "vote_average": 8.3}
+    changed = {"id": 2, "title": "Ronin", "genre_ids": [28], "vote_average": 7.2}
+    new = {"id": 3, "title": "Collateral", "genre_ids": [28], "vote_average": 7.6}
+    stored = {1: movie_content_hash(unchanged, genre_map), 2: movie_content_hash({**changed, "vote_average": 7.0}, genre_map)}
+    assert movies_needing_update([unchanged, changed, new, {"title": "no id"}], genre_map, stored) == [changed, new]
@@ -0,0 +1 @@
+# Lets the tests import the service as the `src` package, the way uvicorn runs it (src.main:app)
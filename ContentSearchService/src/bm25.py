@@ -0,0 +1,142 @@
+import asyncio
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from .settings import settings
+from .titles import title_key
+from .movie_index import MovieIndex
+
+# Fields the index needs from a movie document: the searched text plus what build_movie_filters filters on
+INDEX_PROJECTION = {"title": 1, "overview": 1, "genres": 1, "vote_average": 1}
+# Searched fields and how much a match in each counts (title matches outrank overview matches)
+FIELD_WEIGHTS = {"title": settings.BM25_TITLE_BOOST, "overview": 1.0}
+# Documents indexed between yields to the event loop during a build
+BUILD_BATCH = 1000
+TOKEN = re.compile(r"\w+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Case- and accent-insensitive words, normalized like title_key."""
+    return TOKEN.findall(title_key(text))
+
+def matches_filters(entry: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """Applies build_movie_filters conditions to an indexed movie."""
+    if "genres" in filters and not set(entry["genres"]) & set(filters["genres"]["$in"]):
+        return False
+    if "vote_average" in filters and entry["vote_average"] < filters["vote_average"]["$gte"]:
+        return False
+    return True
+
+class _FieldIndex:
+    """Postings ({term: {movie_id: term frequency}}) and document lengths of one field."""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.lengths: Dict[int, int] = {}
+        self.total_length = 0
+
+    def add(self, movie_id: int, tokens: List[str]):
+        for term, frequency in Counter(tokens).items():
+            self.postings.setdefault(term, {})[movie_id] = frequency
+        self.lengths[movie_id] = len(tokens)
+        self.total_length += len(tokens)
+
+    def remove(self, movie_id: int, tokens: List[str]):
+        for term in set(tokens):
+            movies = self.postings.get(term)
+            if movies is not None:
+                movies.pop(movie_id, None)
+                if not movies:
+                    del self.postings[term]
+        self.total_length -= self.lengths.pop(movie_id, 0)
+
+    def score(self, terms: List[str], scores: Dict[int, float], documents: int, weight: float):
+        """Adds this field's weighted BM25 score of each matching movie to `scores`."""
+        average_length = self.total_length / documents if documents else 0
+        k1, b = settings.BM25_K1, settings.BM25_B
+        for term in terms:
+            movies = self.postings.get(term)
+            if not movies:
+                continue
+            idf = math.log(1 + (documents - len(movies) + 0.5) / (len(movies) + 0.5))
+            for movie_id, frequency in movies.items():
+                norm = 1 - b + b * self.lengths[movie_id] / average_length if average_length else 1
+                scores[movie_id] = scores.get(movie_id, 0.0) + weight * idf * frequency * (k1 + 1) / (frequency + k1 * norm)
+
+class BM25Index(MovieIndex):
+    """
+    In-process inverted index over movie titles and overviews, ranked with BM25 and a title boost
+    (BM25_TITLE_BOOST). Used instead of Mongo's $text index when SEARCH_ENGINE is "bm25", so search
+    ranking is CPU-local and scales with service replicas. Rebuilt every SEARCH_INDEX_REBUILD_INTERVAL
+    seconds (see MovieIndex).
+    """
+
+    description = "BM25 search index"
+
+    def __init__(self):
+        super().__init__()
+        self._fields = {field: _FieldIndex() for field in FIELD_WEIGHTS}
+        # {movie_id: {"tokens": {field: tokens}, "genres": [...], "vote_average": float}}
+        self._movies: Dict[int, Dict[str, Any]] = {}
+        self.ready = False
+
+    @property
+    def rebuild_interval(self) -> float:
+        return settings.SEARCH_INDEX_REBUILD_INTERVAL
+
+    def __len__(self):
+        return len(self._movies)
+
+    def __contains__(self, movie_id: int):
+        return movie_id in self._movies
+
+    def search(self, query: str, limit: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[int]:
+        """IDs of the `limit` best-scoring movies matching `filters` (see build_movie_filters)."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        scores: Dict[int, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            self._fields[field].score(terms, scores, len(self._movies), weight)
+        if filters:
+            scores = {movie_id: score for movie_id, score in scores.items() if matches_filters(self._movies[movie_id], filters)}
+        return heapq.nlargest(limit, scores, key=scores.get)
+
+    def _apply(self, movie_id: int, movie: Dict[str, Any]):
+        self.remove(movie_id)
+        self._insert(self._fields, self._movies, movie_id, movie)
+
+    def remove(self, movie_id: int):
+        entry = self._movies.pop(movie_id, None)
+        if entry is not None:
+            for field, tokens in entry["tokens"].items():
+                self._fields[field].remove(movie_id, tokens)
+
+    async def _load(self, collection):
+        fields = {field: _FieldIndex() for field in FIELD_WEIGHTS}
+        movies: Dict[int, Dict[str, Any]] = {}
+        async for movie in collection.find({}, INDEX_PROJECTION):
+            self._insert(fields, movies, movie["_id"], movie)
+            if len(movies) % BUILD_BATCH == 0:
+                await asyncio.sleep(0) # Let requests through while indexing
+        return fields, movies
+
+    def _swap(self, state):
+        self._fields, self._movies = state
+        self.ready = True
+
+    async def _after_build(self):
+        terms = sum(len(field.postings) for field in self._fields.values())
+        print(f"✅ BM25 search index ready for {len(self._movies)} movies ({terms} terms).")
+
+    @staticmethod
+    def _insert(fields: Dict[str, _FieldIndex], movies: Dict[int, Dict[str, Any]], movie_id: int, movie: Dict[str, Any]):
+        tokens = {field: tokenize(movie.get(field)) for field in FIELD_WEIGHTS}
+        movies[movie_id] = {
+            "tokens": tokens,
+            "genres": movie.get("genres") or [],
+            "vote_average": float(movie.get("vote_average") or 0),
+        }
+        for field, field_tokens in tokens.items():
+            fields[field].add(movie_id, field_tokens)
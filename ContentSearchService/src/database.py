@@ -1,28 +1,73 @@
-from pymongo import MongoClient, TEXT
+from pymongo import AsyncMongoClient, ASCENDING, DESCENDING, IndexModel, TEXT, UpdateOne
 from .settings import settings
+from .titles import title_key
 
 class Database:
-    """Manages the MongoDB connection and ensures the search index exists."""
+    """
+    Manages the async MongoDB connection and ensures the search index exists.
+    Every query is awaited on the event loop, so one slow query never holds up other requests.
+    """
     def __init__(self):
         try:
-            self.client = MongoClient(settings.MONGO_URI)
+            # Connects lazily, on the first awaited operation
+            self.client = AsyncMongoClient(settings.MONGO_URI)
             self.db = self.client[settings.MONGO_DB_NAME]
             self.movies = self.db['movies']
-            print("✅ MongoDB connection successful.")
-            self._ensure_search_index()
+            self.watch_providers = self.db['watch_providers']
+            self.providers = self.db['providers']
+            self.tmdb_cache = self.db['tmdb_cache']
+            print("✅ MongoDB client created.")
         except Exception as e:
             print(f"❌ MongoDB connection failed: {e}")
             raise
 
-    def _ensure_search_index(self):
+    async def ensure_indexes(self):
+        """Creates the indexes the service queries with; called once at startup."""
+        await self._ensure_search_index()
+        # Genre/rating filters and the rating and release-date sorts of the list and search routes.
+        # _id is the keyset tie-breaker, so each sort (in either direction) is a single index walk.
+        await self.movies.create_indexes([
+            IndexModel([("genres", ASCENDING), ("vote_average", DESCENDING), ("_id", DESCENDING)], name="genres_vote_average_id"),
+            IndexModel([("genres", ASCENDING), ("release_date", DESCENDING), ("_id", DESCENDING)], name="genres_release_date_id"),
+            IndexModel([("vote_average", DESCENDING), ("_id", DESCENDING)], name="vote_average_id"),
+            IndexModel([("release_date", DESCENDING), ("_id", DESCENDING)], name="release_date_id"),
+            # Exact title lookups; not unique, since remakes share their title
+            IndexModel([("title_key", ASCENDING)], name="title_key"),
+        ])
+        # Lets Mongo purge expired TMDB cache entries on its own
+        await self.tmdb_cache.create_index([("expires_at", ASCENDING)], name="tmdb_cache_expiry", expireAfterSeconds=0)
+
+    async def backfill_title_keys(self, batch_size: int = 1000):
+        """Adds 'title_key' to movies stored before it existed; run in the background at startup."""
+        updated = 0
+        try:
+            while True:
+                batch = await self.movies.find({"title_key": {"$exists": False}}, {"title": 1}).limit(batch_size).to_list(length=None)
+                if not batch:
+                    break
+                await self.movies.bulk_write([
+                    UpdateOne({"_id": doc["_id"]}, {"$set": {"title_key": title_key(doc.get("title"))}})
+                    for doc in batch
+                ], ordered=False)
+                updated += len(batch)
+        except Exception as e:
+            print(f"❌ Title key backfill stopped after {updated} movies: {e}")
+        if updated:
+            print(f"✅ Added title keys to {updated} movies.")
+
+    async def close(self):
+        """Closes the MongoDB connection."""
+        await self.client.close()
+
+    async def _ensure_search_index(self):
         """
         Creates a text index on the 'title' and 'overview' fields if it doesn't exist.
         This is the key to fast, production-grade text search.
         """
         index_name = "title_overview_text_index"
-        if index_name not in self.movies.index_information():
+        if index_name not in await self.movies.index_information():
             print("Creating text search index on 'movies' collection...")
-            self.movies.create_index([("title", TEXT), ("overview", TEXT)], name=index_name)
+            await self.movies.create_index([("title", TEXT), ("overview", TEXT)], name=index_name)
             print("✅ Text search index created.")
         else:
             print("Text search index already exists.")
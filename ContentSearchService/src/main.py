@@ -5,6 +5,7 @@ import py_eureka_client.eureka_client as eureka_client
 import uvicorn
 
 from .settings import settings
+from .database import db
 from .service import content_service, router  # Import the router from service
 from .models import Movie
 
@@ -18,6 +19,13 @@ app.include_router(router)
 
 @app.on_event("startup")
 async def startup_event():
+    try:
+        await db.ensure_indexes()
+    except Exception as e:
+        print(f"❌ Could not prepare MongoDB indexes: {e}")
+    # Keep a reference so the task is not garbage collected before it finishes
+    app.state.title_key_backfill = asyncio.create_task(db.backfill_title_keys())
+    content_service.start_background_tasks()
     try:
         await eureka_client.init_async(
             eureka_server=settings.EUREKA_SERVER,
@@ -32,6 +40,8 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     await eureka_client.stop_async()
+    await content_service.close()
+    await db.close()
 
 # Keep only the endpoints that are NOT in service.py
 @app.get("/api/content/movies/{movie_id}", response_model=Movie)
@@ -39,7 +49,7 @@ async def get_movie_by_id_local(movie_id: int):
     """
     Retrieve a single movie by its unique ID from the local MongoDB.
     """
-    movie = content_service.get_movie_by_id(movie_id)
+    movie = await content_service.get_movie_by_id(movie_id)
     if not movie:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Movie with ID {movie_id} not found in local database.")
     return movie
@@ -50,11 +60,16 @@ async def get_movie_directly_from_tmdb(movie_id: int):
     Fetches movie details directly from the TMDB API.
     Used as a fallback if the movie isn't in the local DB.
     """
-    movie = content_service.get_movie_details_from_tmdb(movie_id)
+    movie = await content_service.get_movie_details_from_tmdb(movie_id)
     if not movie:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Movie with ID {movie_id} not found on TMDB.")
     return movie
 
+@app.get("/api/content/metrics/tmdb")
+async def get_tmdb_metrics():
+    """Per-endpoint request counts, errors, retries and latency percentiles of the TMDB client."""
+    return content_service.tmdb.metrics()
+
 @app.get("/")
 def read_root():
     return {"status": f"{settings.SERVICE_NAME} is running"}
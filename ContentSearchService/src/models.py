@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, AliasChoices
 from typing import List, Optional, Union, Dict, Any
+from .settings import settings
 
 class Movie(BaseModel):
     # Use AliasChoices to accept either '_id' from Mongo or 'id' from TMDB
@@ -19,4 +20,12 @@ class Movie(BaseModel):
         # Allow population by alias (e.g., using '_id' to set 'id')
         populate_by_name = True
         # Allow extra fields from TMDB/Mongo if not explicitly defined
-        extra = 'ignore'
\ No newline at end of file
+        extra = 'ignore'
+
+class MovieBatchRequest(BaseModel):
+    """Body of POST /api/content/movies/batch."""
+    ids: List[int] = Field(..., min_length=1, max_length=settings.MOVIE_BATCH_MAX_IDS)
+    # Same values as the fields= query parameter of the read routes
+    fields: Optional[str] = None
+    include_providers: bool = False
+    region: str = settings.WATCH_PROVIDER_REGION
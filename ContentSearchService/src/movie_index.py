@@ -0,0 +1,76 @@
+import asyncio
+from typing import Any, Dict, Optional
+
+class MovieIndex:
+    """
+    Base of the in-memory indexes over the movies collection (title suggestions, BM25 search).
+    An index is built from Mongo in the background at startup, rebuilt every `rebuild_interval`
+    seconds to pick up ingestion runs, and updated through add() on every save this service makes.
+    Subclasses implement _load (read the collection into a fresh state), _swap (install it) and
+    _apply (add or replace one movie in the installed state).
+    """
+
+    # Named in log lines
+    description = "index"
+
+    def __init__(self):
+        # Movies added since the last build started, applied again after the next build's swap
+        self._added: Dict[int, Dict[str, Any]] = {}
+        self._refresher: Optional[asyncio.Task] = None
+
+    @property
+    def rebuild_interval(self) -> float:
+        raise NotImplementedError
+
+    def add(self, movie: Dict[str, Any]):
+        """Adds or replaces one movie (a Mongo document or a TMDB result)."""
+        movie_id = int(movie.get("_id", movie.get("id")))
+        self._added[movie_id] = movie
+        self._apply(movie_id, movie)
+
+    async def build(self, collection):
+        """
+        Rebuilds the whole index from the movies collection, then swaps it in. Movies added since the
+        previous build started are applied again after the swap: the cursor may have passed them before
+        their (write-behind) save landed.
+        """
+        added_before, self._added = self._added, {}
+        try:
+            state = await self._load(collection)
+        except Exception:
+            self._added = {**added_before, **self._added}
+            raise
+        self._swap(state)
+        for movie_id, movie in {**added_before, **self._added}.items():
+            self._apply(movie_id, movie)
+        await self._after_build()
+
+    def start(self, collection):
+        """Builds the index in the background now and every `rebuild_interval` seconds."""
+        if self._refresher is None and collection is not None:
+            self._refresher = asyncio.create_task(self._rebuild_periodically(collection))
+
+    async def stop(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+
+    async def _rebuild_periodically(self, collection):
+        while True:
+            try:
+                await self.build(collection)
+            except Exception as e:
+                print(f"❌ Could not build {self.description}: {e}")
+            await asyncio.sleep(self.rebuild_interval)
+
+    async def _load(self, collection) -> Any:
+        raise NotImplementedError
+
+    def _swap(self, state: Any):
+        raise NotImplementedError
+
+    def _apply(self, movie_id: int, movie: Dict[str, Any]):
+        raise NotImplementedError
+
+    async def _after_build(self):
+        """Runs once a rebuilt index is in place."""
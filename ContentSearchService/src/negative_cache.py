@@ -0,0 +1,25 @@
+from .settings import settings
+from .ttl_cache import TTLCache
+
+class NegativeCache:
+    """
+    Normalized queries TMDB had no results for, so a junk or misspelled search does not cost
+    a TMDB round trip every time. Entries expire after NEGATIVE_CACHE_TTL seconds, and past
+    NEGATIVE_CACHE_MAX_ENTRIES the least recently used one is dropped.
+    """
+
+    def __init__(self):
+        self._entries = TTLCache(settings.NEGATIVE_CACHE_TTL, settings.NEGATIVE_CACHE_MAX_ENTRIES)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: str):
+        return self._entries.get(key) is not None
+
+    def add(self, key: str):
+        self._entries.set(key, True)
+
+    def discard(self, key: str):
+        """Forgets a query once a movie with that title is stored."""
+        self._entries.discard(key)
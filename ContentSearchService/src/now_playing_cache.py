@@ -0,0 +1,77 @@
+import asyncio
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from .settings import settings
+
+# ISO 3166-1 alpha-2 code, which is all TMDB's region parameter accepts; anything else is never cached
+REGION_CODE = re.compile(r"^[A-Z]{2}$")
+
+class NowPlayingCache:
+    """
+    In-process cache of TMDB's now-playing page per region, with stale-while-revalidate.
+    An entry younger than NOW_PLAYING_TTL is served as is. An older one is still served for up to
+    NOW_PLAYING_STALE_TTL while a single background fetch replaces it. Only a missing or too-old
+    entry makes the caller wait for TMDB, and concurrent misses share one fetch.
+    `limit` only slices the cached page, so one entry per region serves every limit.
+    """
+
+    def __init__(self, loader: Callable[[str], Awaitable[Optional[List[Dict[str, Any]]]]]):
+        # loader(region) returns the region's now-playing movies, or None if TMDB could not be reached
+        self.loader = loader
+        self._entries: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._refresher: Optional[asyncio.Task] = None
+
+    async def get(self, region: str, limit: int) -> List[Dict[str, Any]]:
+        region = region.upper()
+        if not REGION_CODE.match(region):
+            return []
+        entry = self._entries.get(region)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < settings.NOW_PLAYING_TTL:
+                return entry[1][:limit]
+            if age < settings.NOW_PLAYING_STALE_TTL:
+                self._revalidate(region)
+                return entry[1][:limit]
+        # Shielded, so one caller giving up does not cancel the fetch the others are waiting on
+        results = await asyncio.shield(self._revalidate(region))
+        if results is None:
+            # TMDB is unreachable: a very old page still beats an empty rail
+            return entry[1][:limit] if entry is not None else []
+        return results[:limit]
+
+    def _revalidate(self, region: str) -> asyncio.Task:
+        """Starts (or joins) the fetch of a region's page; the entry is only replaced on success."""
+        task = self._inflight.get(region)
+        if task is None:
+            task = asyncio.create_task(self._load(region))
+            self._inflight[region] = task
+            task.add_done_callback(lambda _: self._inflight.pop(region, None))
+        return task
+
+    async def _load(self, region: str) -> Optional[List[Dict[str, Any]]]:
+        results = await self.loader(region)
+        if results is not None:
+            self._entries[region] = (time.monotonic(), results)
+        return results
+
+    def start(self):
+        """Starts refreshing NOW_PLAYING_HOT_REGIONS every NOW_PLAYING_REFRESH_INTERVAL seconds."""
+        if settings.NOW_PLAYING_HOT_REGIONS and self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_hot_regions())
+
+    async def stop(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+
+    async def _refresh_hot_regions(self):
+        while True:
+            for region in settings.NOW_PLAYING_HOT_REGIONS:
+                try:
+                    await self._revalidate(region)
+                except Exception as e:
+                    print(f"⚠️ Now-playing refresh for {region} failed: {e}")
+            await asyncio.sleep(settings.NOW_PLAYING_REFRESH_INTERVAL)
@@ -1,20 +1,111 @@
+import asyncio
+import base64
+import functools
+import json
+import re
 import pymongo
-import requests
-from typing import List, Optional, Dict, Any
+from typing import Annotated, List, Optional, Dict, Any
 from fastapi import APIRouter, HTTPException, Query
 from datetime import datetime
+from pymongo import ReplaceOne, UpdateOne
 from .database import db
-from .models import Movie
+from .models import Movie, MovieBatchRequest
 from .settings import settings
+from .tmdb_client import tmdb_client
+from .tmdb_cache import CACHED_RESOURCES, TMDBResourceCache
+from .now_playing_cache import REGION_CODE, NowPlayingCache
+from .suggest import MAX_SUGGESTIONS, TitleSuggestions
+from .write_behind import WriteBehindBuffer
+from .single_flight import SingleFlight
+from .negative_cache import NegativeCache
+from .bm25 import BM25Index
+from .titles import title_key
+from .ttl_cache import TTLCache
+from .watch_providers import WATCH_PROVIDER_TYPES, compact_watch_providers, expand_watch_providers, watch_provider_row_id
 
 router = APIRouter()
 
+# TMDB's movie genres; movie documents store the names
+TMDB_GENRES = {
+    28: "Action", 12: "Adventure", 16: "Animation", 35: "Comedy",
+    80: "Crime", 18: "Drama", 10751: "Family", 14: "Fantasy",
+    36: "History", 27: "Horror", 10402: "Music", 9648: "Mystery",
+    10749: "Romance", 878: "Science Fiction", 10770: "TV Movie",
+    53: "Thriller", 10752: "War", 37: "Western"
+}
+
+# Watch providers live in their own collection and are attached only on request; movies stored before
+# that split may still embed them. The others are ingestion bookkeeping (title lookups, change detection,
+# embedding refreshes). Every movie read leaves them all out
+HIDDEN_FIELDS = ("watch_providers", "title_key", "content_hash", "embedding_text_hash")
+MOVIE_PROJECTION = {field: 0 for field in HIDDEN_FIELDS}
+
+# Named field sets for the fields= parameter of read routes; "full" is every stored field
+PROJECTION_PROFILES = {
+    "card": ("title", "poster_path", "release_date", "vote_average", "genres"),
+    "detail": ("title", "original_title", "overview", "poster_path", "backdrop_path", "release_date",
+               "vote_average", "vote_count", "popularity", "original_language", "genres"),
+}
+FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+def build_projection(fields: Optional[str] = None) -> Dict[str, int]:
+    """
+    Mongo projection for a fields= value: a profile name (card, detail, full) or a comma-separated
+    list of top-level fields. _id is always returned. Raises ValueError for an invalid value.
+    """
+    if not fields or fields == "full":
+        return MOVIE_PROJECTION
+    names = PROJECTION_PROFILES.get(fields) or [name.strip() for name in fields.split(",") if name.strip()]
+    invalid = [name for name in names if not FIELD_NAME.match(name) or name in HIDDEN_FIELDS]
+    if invalid or not names:
+        raise ValueError(f"Unknown fields: {', '.join(invalid) or fields}")
+    return {name: 1 for name in names}
+
+def project_tmdb_result(movie_data: Dict[str, Any], projection: Dict[str, int]) -> Dict[str, Any]:
+    """Applies a build_projection projection to a raw TMDB result (which carries 'id', not '_id')."""
+    if projection == MOVIE_PROJECTION:
+        return movie_data
+    return {field: value for field, value in movie_data.items() if field == "id" or field in projection}
+
+def build_movie_filters(genres: Optional[str] = None, min_rating: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Mongo conditions for an optional comma-separated list of genres (any of them, case-insensitive)
+    and a minimum vote_average, served by the genres/vote_average indexes.
+    """
+    filters = {}
+    if genres:
+        canonical = {name.lower(): name for name in TMDB_GENRES.values()}
+        names = [canonical.get(genre.strip().lower(), genre.strip()) for genre in genres.split(",") if genre.strip()]
+        if names:
+            filters["genres"] = {"$in": names}
+    if min_rating is not None:
+        filters["vote_average"] = {"$gte": min_rating}
+    return filters
+
+# Sort keys /api/content/movies accepts; each has a (field, _id) index for keyset pagination
+SORTABLE_FIELDS = ("vote_average", "release_date")
+
+def encode_page_cursor(sort_by: str, sort_order: str, movie: Dict[str, Any]) -> str:
+    """Opaque continuation token pointing just past `movie` in the given sort."""
+    position = {"s": sort_by, "o": sort_order, "v": movie.get(sort_by), "id": movie["_id"]}
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode()).decode()
+
+def decode_page_cursor(token: str, sort_by: str, sort_order: str) -> Dict[str, Any]:
+    """Reads a token from encode_page_cursor; raises ValueError if it is malformed or for another sort."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except Exception:
+        raise ValueError("Malformed cursor")
+    if not isinstance(position, dict) or position.get("s") != sort_by or position.get("o") != sort_order or "id" not in position:
+        raise ValueError("Cursor does not belong to this sort order")
+    return position
+
 # --------------------------------------------------------------------------
 # SERVICE CLASS
 # --------------------------------------------------------------------------
 class ContentService:
     def __init__(self):
-        """Initializes MongoDB connection and TMDB client setup."""
+        """Initializes the async MongoDB collections and the shared TMDB client."""
         self.collection = None
 
         if db is not None and hasattr(db, "movies") and db.movies is not None:
@@ -23,57 +114,98 @@ class ContentService:
         else:
             print("⚠️ Warning: ContentService could not connect to MongoDB 'movies' collection.")
             self.collection = None
+        self.watch_providers_collection = db.watch_providers if self.collection is not None else None
+        self.providers_collection = db.providers if self.collection is not None else None
+        # {provider_id: {name, logo_path}}; the providers collection is small and rarely changes
+        self._provider_details: Dict[int, Dict[str, Any]] = {}
+        # Provider details queued on the write-behind buffer; they move to _provider_details once written
+        self._pending_provider_details: Dict[int, Dict[str, Any]] = {}
+        # {row _id: row} of watch_providers rows queued but not yet written, so readers see them before the flush
+        self._pending_provider_rows: Dict[str, Dict[str, Any]] = {}
+        # {query: count} for list pagination totals
+        self._count_cache = TTLCache(settings.MOVIE_COUNT_CACHE_TTL, settings.MOVIE_COUNT_CACHE_MAX_ENTRIES)
 
-        self.tmdb_base_url = settings.TMDB_API_URL
-        self.tmdb_headers = {
-            "accept": "application/json",
-            "Authorization": f"Bearer {settings.TMDB_READ_ACCESS_TOKEN}"
-        }
+        # Pooled keep-alive client shared by every TMDB call below
+        self.tmdb = tmdb_client
+        # Credits, similar movies and videos are served from Mongo until their TTL runs out
+        self.resource_cache = TMDBResourceCache(db.tmdb_cache if self.collection is not None else None, self.tmdb)
+        self.now_playing = NowPlayingCache(self._fetch_now_playing)
+        # Typeahead served from memory; built from Mongo by start_background_tasks
+        self.suggestions = TitleSuggestions()
+        # Fallback saves and provider rows are written in bulk, off the request path
+        self.writes = WriteBehindBuffer()
+        # Concurrent identical TMDB fallbacks share one upstream call
+        self.tmdb_searches = SingleFlight()
+        self.provider_fetches = SingleFlight()
+        # Normalized queries TMDB had nothing for
+        self.no_tmdb_results = NegativeCache()
+        # In-process BM25 ranking instead of $text when SEARCH_ENGINE is "bm25"
+        self.search_index = BM25Index() if settings.SEARCH_ENGINE == "bm25" else None
         if not settings.TMDB_READ_ACCESS_TOKEN:
             print("⚠️ Warning: TMDB Read Access Token is missing. TMDB API features will fail.")
 
+    def start_background_tasks(self):
+        """Starts the now-playing refresher, the title suggestion and search index builders and the write-behind flusher; called at startup."""
+        self.now_playing.start()
+        self.suggestions.start(self.collection)
+        if self.search_index is not None:
+            self.search_index.start(self.collection)
+        self.writes.start()
+
+    async def close(self):
+        """Stops the background refreshers and closes the TMDB client's pooled connections."""
+        await self.now_playing.stop()
+        await self.suggestions.stop()
+        if self.search_index is not None:
+            await self.search_index.stop()
+        await self.writes.stop()
+        await self.tmdb.close()
+
     # ----------------------------------------------------------------------
     # CORE METHODS - RETURN ALL FIELDS
     # ----------------------------------------------------------------------
-    def get_now_playing_movies(self, region: str = "IN", limit: int = 12) -> List[Dict[str, Any]]:
+    async def get_now_playing_movies(self, region: str = "IN", limit: int = 12,
+                                     projection: Dict[str, int] = MOVIE_PROJECTION) -> List[Dict[str, Any]]:
         if not settings.TMDB_READ_ACCESS_TOKEN:
             print("❌ Cannot fetch 'Now Playing': TMDB Read Access Token missing.")
             return []
+        movies = await self.now_playing.get(region, limit)
+        return [project_tmdb_result(movie, projection) for movie in movies]
+
+    async def _fetch_now_playing(self, region: str) -> Optional[List[Dict[str, Any]]]:
+        """The first now-playing page of a region from TMDB, or None when TMDB can't be reached"""
+        if not settings.TMDB_READ_ACCESS_TOKEN:
+            return None
         endpoint = "/movie/now_playing"
         params = {"region": region, "page": 1, "language": "en-US"}
         try:
-            response = requests.get(
-                f"{self.tmdb_base_url}{endpoint}",
-                headers=self.tmdb_headers,
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-            results = data.get("results", [])[:limit]
+            data = await self.tmdb.get(endpoint, params=params)
+            if data is None:
+                return None
             # Return raw data with all fields
-            return results
+            return data.get("results", [])
         except Exception as e:
             print(f"❌ TMDB error (now playing): {e}")
-            return []
+            return None
 
-    def get_latest_movies(self, limit: int = 12) -> List[Dict[str, Any]]:
+    async def get_latest_movies(self, limit: int = 12, projection: Dict[str, int] = MOVIE_PROJECTION) -> List[Dict[str, Any]]:
         if self.collection is None:
             print("❌ No DB connection.")
             return []
         try:
             cursor = self.collection.find(
                 {"release_date": {"$ne": None, "$exists": True}},
+                projection,
                 sort=[("release_date", pymongo.DESCENDING)],
                 limit=limit
             )
             # Return complete documents with all fields
-            return list(cursor)
+            return await cursor.to_list(length=None)
         except Exception as e:
             print(f"❌ DB error: {e}")
             return []
 
-    def get_movie_by_id(self, movie_id: int) -> Optional[Dict[str, Any]]:
+    async def get_movie_by_id(self, movie_id: int, projection: Dict[str, int] = MOVIE_PROJECTION) -> Optional[Dict[str, Any]]:
         if self.collection is None:
             return None
         try:
@@ -83,7 +215,7 @@ class ContentService:
             except (ValueError, TypeError):
                 return None
                 
-            doc = self.collection.find_one({"_id": movie_id_int})
+            doc = await self.collection.find_one({"_id": movie_id_int}, projection)
             if doc:
                 # Convert ObjectId to string for JSON serialization
                 doc['_id'] = str(doc['_id'])
@@ -93,15 +225,17 @@ class ContentService:
             print(f"❌ DB fetch error: {e}")
             return None
 
-    def search_movies(self, query: Optional[str], limit: int, sort_by: Optional[str], sort_order: str) -> List[Dict[str, Any]]:
+    async def search_movies(self, query: Optional[str], limit: int, sort_by: Optional[str], sort_order: str,
+                            filters: Optional[Dict[str, Any]] = None,
+                            projection: Dict[str, int] = MOVIE_PROJECTION) -> List[Dict[str, Any]]:
         if self.collection is None:
             return []
         try:
-            filter_query = {}
+            filter_query = dict(filters or {})
             sort_params = []
 
             if query:
-                filter_query = {"$text": {"$search": query}}
+                filter_query["$text"] = {"$search": query}
                 sort_params.append(("score", {"$meta": "textScore"}))
             elif sort_by:
                 direction = pymongo.DESCENDING if sort_order == "desc" else pymongo.ASCENDING
@@ -109,14 +243,14 @@ class ContentService:
             else:
                 sort_params.append(("vote_average", pymongo.DESCENDING))
 
-            cursor = self.collection.find(filter_query)
+            cursor = self.collection.find(filter_query, projection)
             if sort_params:
                 cursor = cursor.sort(sort_params)
             if limit:
                 cursor = cursor.limit(limit)
             
             # Return all fields from documents
-            results = list(cursor)
+            results = await cursor.to_list(length=None)
             # Convert ObjectId to string for JSON serialization
             for doc in results:
                 doc['_id'] = str(doc['_id'])
@@ -125,24 +259,87 @@ class ContentService:
             print(f"❌ Error searching DB: {e}")
             return []
 
+    async def list_movies(self, filters: Dict[str, Any], limit: int, sort_by: str, sort_order: str,
+                          cursor: Optional[str] = None, page: int = 1,
+                          projection: Dict[str, int] = MOVIE_PROJECTION) -> Dict[str, Any]:
+        """
+        A page of movies in (sort_by, _id) order plus the token of the next page.
+        With a `cursor`, the page starts right after the token's position (keyset pagination), so
+        any page costs one index seek; without one, `page` falls back to skip/limit.
+        Movies without a value for the sort key are left out, since they have no place in the order.
+        """
+        direction = pymongo.DESCENDING if sort_order == "desc" else pymongo.ASCENDING
+        query = {**filters, sort_by: {**filters.get(sort_by, {}), "$ne": None}}
+        # Decoded first, so a bad cursor fails before any counting
+        position = decode_page_cursor(cursor, sort_by, sort_order) if cursor else None
+        # A filtered total counts every page of this listing (the query without the cursor's position);
+        # an unfiltered one keeps the metadata count, which also includes movies without a sort value
+        total = await self.count_movies(query if filters else {})
+        if position is not None:
+            after = "$lt" if direction == pymongo.DESCENDING else "$gt"
+            query = {"$and": [query, {"$or": [
+                {sort_by: {after: position["v"]}},
+                {sort_by: position["v"], "_id": {after: position["id"]}},
+            ]}]}
+
+        if projection != MOVIE_PROJECTION:
+            # The next cursor is built from the last movie's sort value
+            projection = {**projection, sort_by: 1}
+        find = self.collection.find(query, projection).sort([(sort_by, direction), ("_id", direction)])
+        if not cursor:
+            find = find.skip((page - 1) * limit)
+        movies = await find.limit(limit).to_list(length=None)
+
+        next_cursor = encode_page_cursor(sort_by, sort_order, movies[-1]) if len(movies) == limit else None
+        # Convert ObjectId to string
+        for movie in movies:
+            movie['_id'] = str(movie['_id'])
+        return {"movies": movies, "next_cursor": next_cursor, "total": total}
+
+    async def count_movies(self, filters: Dict[str, Any]) -> int:
+        """
+        Number of movies matching `filters`: the collection's metadata count when unfiltered,
+        otherwise a count reused for MOVIE_COUNT_CACHE_TTL seconds (for up to MOVIE_COUNT_CACHE_MAX_ENTRIES filters).
+        """
+        if not filters:
+            return await self.collection.estimated_document_count()
+        key = json.dumps(filters, sort_keys=True)
+        total = self._count_cache.get(key)
+        if total is None:
+            total = await self.collection.count_documents(filters)
+            self._count_cache.set(key, total)
+        return total
+
     # ----------------------------------------------------------------------
     # ENHANCED SEARCH - RETURN ALL FIELDS
     # ----------------------------------------------------------------------
-    def search_movies_with_fallback(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-        exact_results = self._search_exact_title(query)
+    async def search_movies_with_fallback(self, query: str, limit: int = 10,
+                                          filters: Optional[Dict[str, Any]] = None,
+                                          projection: Dict[str, int] = MOVIE_PROJECTION) -> List[Dict[str, Any]]:
+        """
+        Exact title matches, else $text (or BM25, see SEARCH_ENGINE) matches, else TMDB. `filters` (see build_movie_filters) are part
+        of the Mongo queries, so a stage returns full pages of matching movies and TMDB is only asked
+        when no local movie matches both the query and the filters (and only if it has not recently found
+        nothing for the query). `projection` (see build_projection) trims the returned movies.
+        """
+        filters = filters or {}
+        exact_results = await self._search_exact_title(query, filters, projection)
         if exact_results:
             return exact_results
-        local_results = self._search_movies_fuzzy(query, limit)
+        local_results = await self._search_movies_fuzzy(query, limit, filters, projection)
         if local_results:
             return local_results
-        return self._search_tmdb_and_save(query, limit)
+        movies = await self._search_tmdb_and_save(query, limit, filters)
+        return [project_tmdb_result(movie, projection) for movie in movies]
 
-    def _search_exact_title(self, query: str) -> List[Dict[str, Any]]:
+    async def _search_exact_title(self, query: str, filters: Optional[Dict[str, Any]] = None,
+                                  projection: Dict[str, int] = MOVIE_PROJECTION) -> List[Dict[str, Any]]:
         if self.collection is None:
             return []
         try:
-            filter_query = {"title": {"$regex": f"^{query}$", "$options": "i"}}
-            results = list(self.collection.find(filter_query))
+            # One seek on the title_key index instead of a case-insensitive regex over every title
+            filter_query = {"title_key": title_key(query), **(filters or {})}
+            results = await self.collection.find(filter_query, projection).to_list(length=None)
             # Convert ObjectId to string for JSON serialization
             for doc in results:
                 doc['_id'] = str(doc['_id'])
@@ -151,13 +348,16 @@ class ContentService:
             print(f"❌ Exact search error: {e}")
             return []
 
-    def _search_movies_fuzzy(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    async def _search_movies_fuzzy(self, query: str, limit: int = 10, filters: Optional[Dict[str, Any]] = None,
+                                   projection: Dict[str, int] = MOVIE_PROJECTION) -> List[Dict[str, Any]]:
         if self.collection is None:
             return []
+        if self.search_index is not None and self.search_index.ready:
+            return await self._search_movies_bm25(query, limit, filters, projection)
         try:
-            cursor = self.collection.find({"$text": {"$search": query}})
+            cursor = self.collection.find({"$text": {"$search": query}, **(filters or {})}, projection)
             cursor = cursor.sort([("score", {"$meta": "textScore"})]).limit(limit)
-            results = list(cursor)
+            results = await cursor.to_list(length=None)
             # Convert ObjectId to string for JSON serialization
             for doc in results:
                 doc['_id'] = str(doc['_id'])
@@ -166,22 +366,45 @@ class ContentService:
             print(f"❌ Fuzzy search error: {e}")
             return []
 
-    def _search_tmdb_and_save(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-        if not settings.TMDB_READ_ACCESS_TOKEN:
+    async def _search_movies_bm25(self, query: str, limit: int = 10, filters: Optional[Dict[str, Any]] = None,
+                                  projection: Dict[str, int] = MOVIE_PROJECTION) -> List[Dict[str, Any]]:
+        """Ranks in memory, then loads just the top movies with one $in query, in rank order"""
+        try:
+            movie_ids = self.search_index.search(query, limit, filters)
+            if not movie_ids:
+                return []
+            docs = await self.collection.find({"_id": {"$in": movie_ids}}, projection).to_list(length=None)
+            by_id = {doc["_id"]: doc for doc in docs}
+            results = [by_id[movie_id] for movie_id in movie_ids if movie_id in by_id]
+            # Convert ObjectId to string for JSON serialization
+            for doc in results:
+                doc['_id'] = str(doc['_id'])
+            return results
+        except Exception as e:
+            print(f"❌ BM25 search error: {e}")
+            return []
+
+    async def _search_tmdb_and_save(self, query: str, limit: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        key = title_key(query)
+        if not settings.TMDB_READ_ACCESS_TOKEN or key in self.no_tmdb_results:
             return []
         try:
-            response = requests.get(
-                f"{self.tmdb_base_url}/search/movie",
-                headers=self.tmdb_headers,
-                params={"query": query, "page": 1, "language": "en-US"},
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-            results = data.get("results", [])[:limit]
+            # Keyed by the normalized query, so 'Dune' and 'dune ' ride on the same TMDB call
+            data = await self.tmdb_searches.do(key, lambda: self.tmdb.get(
+                "/search/movie",
+                params={"query": query, "page": 1, "language": "en-US"}
+            ))
+            if data is not None and not data.get("results"):
+                # Only a definite empty answer is remembered, never an error
+                self.no_tmdb_results.add(key)
+            data = data or {}
+            results = [
+                movie_data for movie_data in data.get("results", [])
+                if self._matches_filters(movie_data, filters or {})
+            ][:limit]
             movies = []
             for movie_data in results:
-                # Save to database
+                # Save to database (in the background)
                 self._save_movie_to_db(movie_data)
                 # Return the complete movie data
                 movies.append(movie_data)
@@ -191,112 +414,296 @@ class ContentService:
             return []
 
     def _save_movie_to_db(self, movie_data: Dict[str, Any]):
+        """Queues an insert-if-absent of a TMDB result; the write-behind buffer applies it in bulk"""
         if self.collection is None:
             return
+        movie_id = movie_data.get("id")
+        if not movie_id:
+            return
+        # Create document with all fields from TMDB
+        doc = movie_data.copy()
+        doc["_id"] = doc.pop("id")  # Move 'id' to '_id' for MongoDB
+        doc["title_key"] = title_key(doc.get("title"))
+        self.no_tmdb_results.discard(doc["title_key"])
+        # Store genre names like ingested movies, so genre filters and indexes cover it
+        if "genres" not in doc:
+            doc["genres"] = self._get_genre_names(doc.get("genre_ids", []))
+        # $setOnInsert keeps the write idempotent and never overwrites an ingested movie
+        fields = {field: value for field, value in doc.items() if field != "_id"}
+        self.writes.put(self.collection, movie_id, UpdateOne({"_id": movie_id}, {"$setOnInsert": fields}, upsert=True))
+        if movie_id not in self.suggestions:
+            self.suggestions.add(doc)
+        if self.search_index is not None and movie_id not in self.search_index:
+            self.search_index.add(doc)
+
+    async def get_movie_details_from_tmdb(self, movie_id: int) -> Optional[Dict[str, Any]]:
+        """Fetch a movie's details straight from TMDB, without touching the database"""
+        if not settings.TMDB_READ_ACCESS_TOKEN:
+            return None
         try:
-            movie_id = movie_data.get("id")
-            if movie_id and self.collection.find_one({"_id": movie_id}) is None:
-                # Create document with all fields from TMDB
-                doc = movie_data.copy()
-                doc["_id"] = doc.pop("id")  # Move 'id' to '_id' for MongoDB
-                self.collection.insert_one(doc)
-                print(f"✅ Saved movie to DB: {doc.get('title')} (ID: {movie_id})")
+            return await self.tmdb.get(f"/movie/{movie_id}", params={"language": "en-US"})
         except Exception as e:
-            print(f"❌ Save error: {e}")
+            print(f"❌ TMDB details error: {e}")
+            return None
 
     def _get_genre_names(self, genre_ids: List[int]) -> List[str]:
-        genre_map = {
-            28: "Action", 12: "Adventure", 16: "Animation", 35: "Comedy",
-            80: "Crime", 18: "Drama", 10751: "Family", 14: "Fantasy",
-            36: "History", 27: "Horror", 10402: "Music", 9648: "Mystery",
-            10749: "Romance", 878: "Science Fiction", 10770: "TV Movie",
-            53: "Thriller", 10752: "War", 37: "Western"
-        }
-        return [genre_map.get(i, f"Genre_{i}") for i in genre_ids]
+        return [TMDB_GENRES.get(i, f"Genre_{i}") for i in genre_ids]
+
+    def _matches_filters(self, movie_data: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+        """Applies build_movie_filters conditions to a raw TMDB result, which only has genre_ids."""
+        if "genres" in filters and not set(self._get_genre_names(movie_data.get("genre_ids", []))) & set(filters["genres"]["$in"]):
+            return False
+        if "vote_average" in filters and (movie_data.get("vote_average") or 0) < filters["vote_average"]["$gte"]:
+            return False
+        return True
 
     # ----------------------------------------------------------------------
     # ADDITIONAL METHODS FOR COMPLETE DATA
     # ----------------------------------------------------------------------
-    def get_movie_with_watch_providers(self, movie_id: int) -> Optional[Dict[str, Any]]:
-        """Get movie with watch providers information"""
-        movie = self.get_movie_by_id(movie_id)
+    async def get_movie_with_watch_providers(self, movie_id: int, region: str = settings.WATCH_PROVIDER_REGION,
+                                             projection: Dict[str, int] = MOVIE_PROJECTION) -> Optional[Dict[str, Any]]:
+        """Get movie with the watch providers of one region, fetching them from TMDB the first time"""
+        movie = await self.get_movie_by_id(movie_id, projection)
         if not movie:
             return None
-        
-        # Add watch providers from TMDB if not already in the document
-        if 'watch_providers' not in movie and settings.TMDB_READ_ACCESS_TOKEN:
+        providers = await self.get_movie_watch_providers(movie_id, region)
+        if providers is not None:
+            movie['watch_providers'] = providers
+        return movie
+
+    async def get_movies_by_ids(self, movie_ids: List[int], projection: Dict[str, int] = MOVIE_PROJECTION,
+                                include_providers: bool = False,
+                                region: str = settings.WATCH_PROVIDER_REGION) -> Dict[str, Any]:
+        """
+        Resolves many movies with one $in query, in the order asked for, and lists the IDs not found.
+        With include_providers, stored providers come from one more $in query; only movies whose
+        providers were never fetched go to TMDB, MOVIE_BATCH_PROVIDER_CONCURRENCY at a time and at most
+        MOVIE_BATCH_MAX_PROVIDER_FETCHES per request. Movies left over are listed in providers_unknown_ids.
+        """
+        movie_ids = list(dict.fromkeys(int(movie_id) for movie_id in movie_ids))
+        if self.collection is None or not movie_ids:
+            return {"movies": [], "missing_ids": movie_ids}
+        providers_unknown_ids = []
+
+        docs = await self.collection.find({"_id": {"$in": movie_ids}}, projection).to_list(length=None)
+        by_id = {doc["_id"]: doc for doc in docs}
+
+        if include_providers and by_id:
+            region = region.upper()
+            providers = await self.get_watch_providers(list(by_id), region)
+            unknown = [movie_id for movie_id in by_id if movie_id not in providers]
+            if unknown and settings.TMDB_READ_ACCESS_TOKEN:
+                semaphore = asyncio.Semaphore(settings.MOVIE_BATCH_PROVIDER_CONCURRENCY)
+
+                async def fetch(movie_id):
+                    # Already known to be missing from Mongo, so straight to TMDB (shared with concurrent requests)
+                    async with semaphore:
+                        try:
+                            return movie_id, await self.provider_fetches.do(
+                                (movie_id, region), lambda: self._fetch_movie_watch_providers(movie_id, region)
+                            )
+                        except Exception as e:
+                            print(f"❌ Error fetching watch providers: {e}")
+                            return movie_id, None
+
+                fetched = unknown[:settings.MOVIE_BATCH_MAX_PROVIDER_FETCHES]
+                for movie_id, movie_providers in await asyncio.gather(*(fetch(movie_id) for movie_id in fetched)):
+                    if movie_providers is not None:
+                        providers[movie_id] = movie_providers
+            providers_unknown_ids = [movie_id for movie_id in movie_ids if movie_id in by_id and movie_id not in providers]
+            for movie_id, doc in by_id.items():
+                if movie_id in providers:
+                    doc['watch_providers'] = providers[movie_id]
+
+        movies = []
+        for movie_id in movie_ids:
+            if movie_id in by_id:
+                # Convert ObjectId to string for JSON serialization, like get_movie_by_id
+                by_id[movie_id]['_id'] = str(movie_id)
+                movies.append(by_id[movie_id])
+        return {"movies": movies, "missing_ids": [movie_id for movie_id in movie_ids if movie_id not in by_id],
+                "providers_unknown_ids": providers_unknown_ids}
+
+    async def get_movie_watch_providers(self, movie_id: int, region: str) -> Optional[Dict[str, Any]]:
+        """A movie's watch providers in one region, stored on the first fetch from TMDB; None if unknown"""
+        region = region.upper()
+        providers = await self.get_watch_providers([int(movie_id)], region)
+        if int(movie_id) not in providers and settings.TMDB_READ_ACCESS_TOKEN:
             try:
-                response = requests.get(
-                    f"{self.tmdb_base_url}/movie/{movie_id}/watch/providers",
-                    headers=self.tmdb_headers,
-                    timeout=10
+                # Concurrent first requests for the same movie and region share one TMDB call
+                return await self.provider_fetches.do(
+                    (int(movie_id), region), lambda: self._fetch_movie_watch_providers(int(movie_id), region)
                 )
-                if response.status_code == 200:
-                    providers_data = response.json()
-                    movie['watch_providers'] = providers_data.get('results', {})
-                    # Update the document in database
-                    self._update_movie_watch_providers(movie_id, movie['watch_providers'])
             except Exception as e:
                 print(f"❌ Error fetching watch providers: {e}")
-        
+        return providers.get(int(movie_id))
+
+    async def _fetch_movie_watch_providers(self, movie_id: int, region: str) -> Optional[Dict[str, Any]]:
+        """Fetches a movie's providers from TMDB and queues them for storage; None if TMDB has none"""
+        providers_data = await self.tmdb.get(f"/movie/{movie_id}/watch/providers")
+        if providers_data is None:
+            return None
+        return self._update_movie_watch_providers(movie_id, providers_data.get('results', {}), region)
+
+    async def get_complete_movie(self, movie_id: int, region: str = settings.WATCH_PROVIDER_REGION,
+                                 projection: Dict[str, int] = MOVIE_PROJECTION) -> Optional[Dict[str, Any]]:
+        """
+        Get a movie with its watch providers, credits, similar movies and videos.
+        The movie, its providers and each cached TMDB sub-resource are fetched concurrently, and a part
+        that misses COMPLETE_PART_DEADLINE is left out instead of holding up the response (it keeps
+        running in the background, so the next request finds it cached).
+        """
+        movie_task = asyncio.create_task(self.get_movie_by_id(movie_id, projection))
+        part_tasks = {"watch_providers": asyncio.create_task(self.get_movie_watch_providers(movie_id, region))}
+        if settings.TMDB_READ_ACCESS_TOKEN:
+            for field in CACHED_RESOURCES:
+                part_tasks[field] = asyncio.create_task(self._fetch_movie_part(field, movie_id))
+
+        movie = await movie_task
+        if not movie:
+            for task in part_tasks.values():
+                task.cancel()
+            return None
+
+        # The parts have been running since the movie lookup started; they share one deadline
+        done, pending = await asyncio.wait(part_tasks.values(), timeout=settings.COMPLETE_PART_DEADLINE)
+        for field, task in part_tasks.items():
+            if task in pending:
+                self.resource_cache.keep_running(task)
+                print(f"⚠️ Omitting '{field}' of movie {movie_id}: TMDB did not answer within {settings.COMPLETE_PART_DEADLINE}s.")
+            elif task.exception() is None and task.result() is not None:
+                movie[field] = task.result()
         return movie
 
-    def _update_movie_watch_providers(self, movie_id: int, watch_providers: Dict[str, Any]):
-        """Update watch providers in the database"""
-        if self.collection is None:
-            return
+    async def _fetch_movie_part(self, resource: str, movie_id: int) -> Optional[Any]:
+        """One TMDB sub-resource of a movie, from the cache when fresh; None on failure"""
         try:
-            self.collection.update_one(
-                {"_id": movie_id},
-                {"$set": {"watch_providers": watch_providers}}
+            return await self.resource_cache.get(resource, int(movie_id))
+        except Exception as e:
+            print(f"❌ Error fetching {resource} of movie {movie_id}: {e}")
+            return None
+
+    async def get_watch_providers(self, movie_ids: List[int], region: str) -> Dict[int, Dict[str, Any]]:
+        """
+        Watch providers of the given movies in one region, in TMDB's single-region shape.
+        Movies whose providers were never stored are left out; known movies without providers map to {}.
+        Rows still waiting on the write-behind buffer count as stored.
+        """
+        if self.watch_providers_collection is None or not movie_ids:
+            return {}
+        try:
+            row_ids = [watch_provider_row_id(movie_id, region) for movie_id in movie_ids]
+            rows = [self._pending_provider_rows[row_id] for row_id in row_ids if row_id in self._pending_provider_rows]
+            stored_ids = [row_id for row_id in row_ids if row_id not in self._pending_provider_rows]
+            if stored_ids:
+                rows += await self.watch_providers_collection.find({"_id": {"$in": stored_ids}}).to_list(length=None)
+            provider_details = await self._get_provider_details(
+                {provider_id for row in rows for offer_type in WATCH_PROVIDER_TYPES for provider_id in row.get(offer_type, [])}
             )
+            return {row["movie_id"]: expand_watch_providers(row, provider_details) for row in rows}
         except Exception as e:
-            print(f"❌ Error updating watch providers: {e}")
+            print(f"❌ Error reading watch providers: {e}")
+            return {}
+
+    async def _get_provider_details(self, provider_ids: set) -> Dict[int, Dict[str, Any]]:
+        """Provider names and logos, loading the ones not seen yet from the providers collection."""
+        missing = [provider_id for provider_id in provider_ids
+                   if provider_id not in self._provider_details and provider_id not in self._pending_provider_details]
+        if missing:
+            async for provider in self.providers_collection.find({"_id": {"$in": missing}}):
+                self._provider_details[provider["_id"]] = {"name": provider.get("name"), "logo_path": provider.get("logo_path")}
+        return self._known_provider_details()
+
+    def _known_provider_details(self) -> Dict[int, Dict[str, Any]]:
+        """Stored provider details, overlaid with the ones still waiting on the write-behind buffer."""
+        if not self._pending_provider_details:
+            return self._provider_details
+        return {**self._provider_details, **self._pending_provider_details}
+
+    def _provider_written(self, provider_id: int, details: Dict[str, Any]):
+        """Write-behind callback: the provider is stored, so it no longer needs writing."""
+        self._provider_details[provider_id] = details
+        self._forget_pending_provider(provider_id, details)
+
+    def _forget_pending_provider(self, provider_id: int, details: Dict[str, Any]):
+        """Write-behind callback (also when the write is dropped), unless newer details were queued since."""
+        if self._pending_provider_details.get(provider_id) is details:
+            del self._pending_provider_details[provider_id]
+
+    def _forget_pending_provider_row(self, row: Dict[str, Any]):
+        """Write-behind callback: the row is in Mongo now (or was dropped), unless a newer one was queued since."""
+        if self._pending_provider_rows.get(row["_id"]) is row:
+            del self._pending_provider_rows[row["_id"]]
+
+    def _update_movie_watch_providers(self, movie_id: int, results: Dict[str, Any], region: str) -> Dict[str, Any]:
+        """
+        Queues TMDB's {region: providers} map as compact per-region rows, plus the providers they
+        reference, on the write-behind buffer, and returns the requested region's providers.
+        The requested region always gets a row, so a movie without providers there is not refetched.
+        """
+        rows, referenced = [], {}
+        for provider_region, providers in {region: {}, **results}.items():
+            row, region_providers = compact_watch_providers(movie_id, provider_region, providers or {})
+            rows.append(row)
+            referenced.update(region_providers)
+
+        for provider_id, details in referenced.items():
+            if self._provider_details.get(provider_id) != details and self._pending_provider_details.get(provider_id) != details:
+                # _provider_details only learns of the provider once the write has landed, so a failed
+                # flush leaves it to be written again rather than looking stored
+                self._pending_provider_details[provider_id] = details
+                self.writes.put(self.providers_collection, provider_id,
+                                UpdateOne({"_id": provider_id}, {"$set": details}, upsert=True),
+                                on_written=functools.partial(self._provider_written, provider_id, details),
+                                on_dropped=functools.partial(self._forget_pending_provider, provider_id, details))
+        for row in rows:
+            self._pending_provider_rows[row["_id"]] = row
+            forget = functools.partial(self._forget_pending_provider_row, row)
+            self.writes.put(self.watch_providers_collection, row["_id"], ReplaceOne({"_id": row["_id"]}, row, upsert=True),
+                            on_written=forget, on_dropped=forget)
+        # rows[0] is the requested region's row
+        return expand_watch_providers(rows[0], self._known_provider_details())
 
 
 # Global instance
 content_service = ContentService()
 
 # --------------------------------------------------------------------------
-# ROUTES - RETURN ALL FIELDS
+# ROUTES - RETURN ALL FIELDS UNLESS fields= ASKS FOR LESS
 # --------------------------------------------------------------------------
+FieldsParam = Annotated[Optional[str], Query(description="Projection: card, detail, full (default) or a comma-separated list of fields")]
+
+def _projection_or_400(fields: Optional[str]) -> Dict[str, int]:
+    try:
+        return build_projection(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/api/content/search")
 async def search_content(
     query: str = "",
     limit: int = Query(10, ge=1, le=50),
     genres: Optional[str] = Query(None),
-    min_rating: Optional[float] = Query(None)
+    min_rating: Optional[float] = Query(None),
+    fields: FieldsParam = None
 ):
+    projection = _projection_or_400(fields)
     try:
         if not query.strip():
             return {"movies": [], "total_count": 0, "message": "Empty query"}
         
-        movies = content_service.search_movies_with_fallback(query, limit)
-        
-        # Apply additional filters if provided
-        filtered_movies = []
+        movies = await content_service.search_movies_with_fallback(
+            query, limit, build_movie_filters(genres, min_rating), projection
+        )
+
         for movie in movies:
-            # Filter by genres if provided
-            if genres:
-                movie_genres = movie.get('genres', [])
-                if isinstance(movie_genres, list) and not any(genre.lower() in [g.lower() for g in movie_genres] for genre in genres.split(',')):
-                    continue
-            
-            # Filter by minimum rating if provided
-            if min_rating is not None:
-                movie_rating = movie.get('vote_average', 0)
-                if movie_rating < min_rating:
-                    continue
-            
             # Ensure poster_url is included
             if movie.get('poster_path'):
                 movie['poster_url'] = f"https://image.tmdb.org/t/p/w500{movie['poster_path']}"
-            
-            filtered_movies.append(movie)
         
         return {
-            "movies": filtered_movies, 
-            "total_count": len(filtered_movies), 
+            "movies": movies, 
+            "total_count": len(movies), 
             "query": query,
             "filters_applied": {
                 "genres": genres,
@@ -307,69 +714,65 @@ async def search_content(
         raise HTTPException(status_code=500, detail=f"Search failed: {e}")
 
 
+@router.get("/api/content/suggest")
+async def suggest_titles(q: str = "", limit: int = Query(8, ge=1, le=MAX_SUGGESTIONS)):
+    """Typeahead: movies whose title (or a word in it) starts with `q`, best rated first. Never touches Mongo."""
+    return {"query": q, "suggestions": content_service.suggestions.suggest(q, limit)}
+
+
 @router.get("/api/content/latest")
-async def get_latest(limit: int = 12):
-    """Get latest movies with all fields"""
-    movies = content_service.get_latest_movies(limit)
+async def get_latest(limit: int = 12, fields: FieldsParam = None):
+    """Get latest movies with all fields, or the ones selected by `fields`"""
+    movies = await content_service.get_latest_movies(limit, _projection_or_400(fields))
     return movies
 
 
 @router.get("/api/content/now-playing")
-async def get_now_playing(region: str = "IN", limit: int = 12):
-    """Get now playing movies with all fields"""
-    movies = content_service.get_now_playing_movies(region, limit)
+async def get_now_playing(region: str = "IN", limit: int = 12, fields: FieldsParam = None):
+    """Get now playing movies with all fields, or the ones selected by `fields`"""
+    if not REGION_CODE.match(region.upper()):
+        raise HTTPException(status_code=400, detail="region must be a two-letter country code")
+    movies = await content_service.get_now_playing_movies(region, limit, _projection_or_400(fields))
     return movies
 
 
+@router.post("/api/content/movies/batch")
+async def get_movies_batch(request: MovieBatchRequest):
+    """Resolve up to MOVIE_BATCH_MAX_IDS movies in one call, optionally projected and with watch providers"""
+    projection = _projection_or_400(request.fields)
+    return await content_service.get_movies_by_ids(
+        request.ids, projection, include_providers=request.include_providers, region=request.region
+    )
+
+
 @router.get("/api/content/movies/{movie_id}")
-async def get_movie(movie_id: int):
-    """Get movie by ID with all fields including watch providers"""
-    movie = content_service.get_movie_with_watch_providers(movie_id)
+async def get_movie(
+    movie_id: int,
+    include_providers: bool = Query(True),
+    region: str = Query(settings.WATCH_PROVIDER_REGION),
+    fields: FieldsParam = None
+):
+    """Get movie by ID with all fields, plus the watch providers of `region` unless include_providers=false"""
+    projection = _projection_or_400(fields)
+    if include_providers:
+        movie = await content_service.get_movie_with_watch_providers(movie_id, region, projection)
+    else:
+        movie = await content_service.get_movie_by_id(movie_id, projection)
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
     return movie
 
 
 @router.get("/api/content/movies/{movie_id}/complete")
-async def get_complete_movie(movie_id: int):
+async def get_complete_movie(
+    movie_id: int,
+    region: str = Query(settings.WATCH_PROVIDER_REGION),
+    fields: FieldsParam = None
+):
     """Get complete movie data with all possible information"""
-    movie = content_service.get_movie_with_watch_providers(movie_id)
+    movie = await content_service.get_complete_movie(movie_id, region, _projection_or_400(fields))
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
-    
-    # Add additional TMDB information if available
-    if settings.TMDB_READ_ACCESS_TOKEN:
-        try:
-            # Get credits
-            credits_response = requests.get(
-                f"{content_service.tmdb_base_url}/movie/{movie_id}/credits",
-                headers=content_service.tmdb_headers,
-                timeout=10
-            )
-            if credits_response.status_code == 200:
-                movie['credits'] = credits_response.json()
-            
-            # Get similar movies
-            similar_response = requests.get(
-                f"{content_service.tmdb_base_url}/movie/{movie_id}/similar",
-                headers=content_service.tmdb_headers,
-                timeout=10
-            )
-            if similar_response.status_code == 200:
-                movie['similar_movies'] = similar_response.json().get('results', [])[:6]
-            
-            # Get videos (trailers)
-            videos_response = requests.get(
-                f"{content_service.tmdb_base_url}/movie/{movie_id}/videos",
-                headers=content_service.tmdb_headers,
-                timeout=10
-            )
-            if videos_response.status_code == 200:
-                movie['videos'] = videos_response.json().get('results', [])
-                
-        except Exception as e:
-            print(f"❌ Error fetching additional movie data: {e}")
-    
     return movie
 
 
@@ -378,35 +781,35 @@ async def get_movies(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     sort_by: str = Query("vote_average"),
-    sort_order: str = Query("desc")
+    sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    genres: Optional[str] = Query(None),
+    min_rating: Optional[float] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; takes precedence over page"),
+    fields: FieldsParam = None
 ):
-    """Get paginated movies with all fields"""
+    """Get paginated movies with all fields, optionally filtered by genres and minimum rating"""
+    if content_service.collection is None:
+        raise HTTPException(status_code=500, detail="Database not available")
+    if sort_by not in SORTABLE_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort_by must be one of: {', '.join(SORTABLE_FIELDS)}")
+    projection = _projection_or_400(fields)
     try:
-        if content_service.collection is None:
-            raise HTTPException(status_code=500, detail="Database not available")
-        
-        skip = (page - 1) * limit
-        cursor = content_service.collection.find().skip(skip).limit(limit)
-        
-        # Apply sorting
-        direction = pymongo.DESCENDING if sort_order == "desc" else pymongo.ASCENDING
-        cursor = cursor.sort(sort_by, direction)
-        
-        movies = list(cursor)
-        total = content_service.collection.count_documents({})
-        
-        # Convert ObjectId to string
-        for movie in movies:
-            movie['_id'] = str(movie['_id'])
-        
-        return {
-            "movies": movies,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total": total,
-                "pages": (total + limit - 1) // limit
-            }
-        }
+        result = await content_service.list_movies(
+            build_movie_filters(genres, min_rating), limit, sort_by, sort_order,
+            cursor=cursor, page=page, projection=projection
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch movies: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to fetch movies: {e}")
+
+    total = result["total"]
+    pagination = {
+        "limit": limit,
+        "total": total,
+        "pages": (total + limit - 1) // limit,
+        "next_cursor": result["next_cursor"]
+    }
+    if not cursor:
+        pagination["page"] = page
+    return {"movies": result["movies"], "pagination": pagination}
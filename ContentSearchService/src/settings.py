@@ -7,8 +7,65 @@ class Settings:
     TMDB_API_URL: str = "https://api.themoviedb.org/3"
     TMDB_API_KEY: str = os.getenv("TMDB_API_KEY")
     TMDB_READ_ACCESS_TOKEN: str = os.getenv("TMDB_READ_ACCESS_TOKEN")
+    # Pooled TMDB client: timeouts per phase of a request (seconds), pool size and bounded retries
+    TMDB_CONNECT_TIMEOUT: float = float(os.getenv("TMDB_CONNECT_TIMEOUT", 3))
+    TMDB_READ_TIMEOUT: float = float(os.getenv("TMDB_READ_TIMEOUT", 8))
+    TMDB_WRITE_TIMEOUT: float = float(os.getenv("TMDB_WRITE_TIMEOUT", 5))
+    TMDB_POOL_TIMEOUT: float = float(os.getenv("TMDB_POOL_TIMEOUT", 2))
+    TMDB_MAX_CONNECTIONS: int = int(os.getenv("TMDB_MAX_CONNECTIONS", 100))
+    TMDB_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("TMDB_MAX_KEEPALIVE_CONNECTIONS", 20))
+    TMDB_KEEPALIVE_EXPIRY: float = float(os.getenv("TMDB_KEEPALIVE_EXPIRY", 30))
+    TMDB_MAX_RETRIES: int = int(os.getenv("TMDB_MAX_RETRIES", 2))
+    TMDB_BACKOFF_BASE: float = float(os.getenv("TMDB_BACKOFF_BASE", 0.2))
+    TMDB_BACKOFF_MAX: float = float(os.getenv("TMDB_BACKOFF_MAX", 2))
+    # Seconds /movies/{id}/complete waits for each TMDB sub-resource before leaving it out
+    COMPLETE_PART_DEADLINE: float = float(os.getenv("COMPLETE_PART_DEADLINE", 2.5))
+    # Mongo cache of TMDB movie sub-resources: TTL per resource (seconds), and the final fraction
+    # of a TTL during which an entry is still served but refreshed in the background
+    CREDITS_CACHE_TTL: int = int(os.getenv("CREDITS_CACHE_TTL", 7 * 24 * 3600))
+    SIMILAR_CACHE_TTL: int = int(os.getenv("SIMILAR_CACHE_TTL", 24 * 3600))
+    VIDEOS_CACHE_TTL: int = int(os.getenv("VIDEOS_CACHE_TTL", 24 * 3600))
+    TMDB_CACHE_REFRESH_AHEAD: float = float(os.getenv("TMDB_CACHE_REFRESH_AHEAD", 0.2))
+    # In-process now-playing cache (seconds): served fresh, then stale while a refetch runs;
+    # hot regions are refreshed in the background so the home-page rail never waits on TMDB
+    NOW_PLAYING_TTL: int = int(os.getenv("NOW_PLAYING_TTL", 1800))
+    NOW_PLAYING_STALE_TTL: int = int(os.getenv("NOW_PLAYING_STALE_TTL", 24 * 3600))
+    NOW_PLAYING_REFRESH_INTERVAL: int = int(os.getenv("NOW_PLAYING_REFRESH_INTERVAL", 1500))
+    NOW_PLAYING_HOT_REGIONS: list = [
+        region.strip().upper() for region in os.getenv("NOW_PLAYING_HOT_REGIONS", "IN").split(",") if region.strip()
+    ]
+    # Seconds a filtered movie count is reused by /api/content/movies
+    MOVIE_COUNT_CACHE_TTL: int = int(os.getenv("MOVIE_COUNT_CACHE_TTL", 300))
+    # Most distinct filter combinations whose counts are kept
+    MOVIE_COUNT_CACHE_MAX_ENTRIES: int = int(os.getenv("MOVIE_COUNT_CACHE_MAX_ENTRIES", 1000))
+    # Seconds between full rebuilds of the in-memory title suggestions (picks up ingestion runs)
+    SUGGEST_REBUILD_INTERVAL: int = int(os.getenv("SUGGEST_REBUILD_INTERVAL", 3600))
+    # POST /api/content/movies/batch: most IDs per request, and parallel TMDB fetches for providers never stored
+    MOVIE_BATCH_MAX_IDS: int = int(os.getenv("MOVIE_BATCH_MAX_IDS", 500))
+    MOVIE_BATCH_PROVIDER_CONCURRENCY: int = int(os.getenv("MOVIE_BATCH_PROVIDER_CONCURRENCY", 8))
+    # Most never-stored providers one batch request fetches from TMDB; the rest are reported as not yet known
+    MOVIE_BATCH_MAX_PROVIDER_FETCHES: int = int(os.getenv("MOVIE_BATCH_MAX_PROVIDER_FETCHES", 24))
+    # Write-behind buffer for fallback saves and provider rows: flush period (seconds) and batch size
+    WRITE_BEHIND_FLUSH_INTERVAL: float = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", 1))
+    WRITE_BEHIND_BATCH_SIZE: int = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", 500))
+    # Flushes a failed write is retried in before it is dropped, and most writes queued before the oldest are dropped
+    WRITE_BEHIND_MAX_RETRIES: int = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", 5))
+    WRITE_BEHIND_MAX_PENDING: int = int(os.getenv("WRITE_BEHIND_MAX_PENDING", 20000))
+    # Queries TMDB found nothing for are not sent again for this long (seconds); at most this many are remembered
+    NEGATIVE_CACHE_TTL: int = int(os.getenv("NEGATIVE_CACHE_TTL", 900))
+    NEGATIVE_CACHE_MAX_ENTRIES: int = int(os.getenv("NEGATIVE_CACHE_MAX_ENTRIES", 10000))
+    # Engine behind search's second stage: "mongo" ($text index) or "bm25" (in-process index over title and overview)
+    SEARCH_ENGINE: str = os.getenv("SEARCH_ENGINE", "mongo").lower()
+    # BM25 term-frequency saturation and length normalization, and how much more a title match counts than an overview match
+    BM25_K1: float = float(os.getenv("BM25_K1", 1.2))
+    BM25_B: float = float(os.getenv("BM25_B", 0.75))
+    BM25_TITLE_BOOST: float = float(os.getenv("BM25_TITLE_BOOST", 3.0))
+    # Seconds between full rebuilds of the BM25 index (picks up ingestion runs)
+    SEARCH_INDEX_REBUILD_INTERVAL: int = int(os.getenv("SEARCH_INDEX_REBUILD_INTERVAL", 3600))
     MONGO_URI: str = os.getenv("MONGO_URI")
     MONGO_DB_NAME: str = os.getenv("MONGO_DB_NAME")
+    # Region whose watch providers movie detail routes attach by default
+    WATCH_PROVIDER_REGION: str = os.getenv("WATCH_PROVIDER_REGION", "IN")
     
     SERVICE_NAME: str = os.getenv("SERVICE_NAME", "content-search-service")
     SERVICE_PORT: int = int(os.getenv("SERVICE_PORT", 8001))
@@ -0,0 +1,24 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller starts the work, every caller
+    that arrives while it runs awaits the same task, and the key is free again once it finishes.
+    The result is shared by all of them, so callers must not mutate it.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self):
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(work())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded, so one caller giving up does not cancel the call the others are waiting on
+        return await asyncio.shield(task)
@@ -0,0 +1,132 @@
+import asyncio
+import heapq
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Tuple
+from .settings import settings
+from .titles import title_key
+from .movie_index import MovieIndex
+
+# Fields the index needs from a movie document
+SUGGEST_PROJECTION = {"title": 1, "release_date": 1, "poster_path": 1, "vote_average": 1}
+# Most suggestions one request can ask for; each prefix's answer is computed (and cached) at this size
+MAX_SUGGESTIONS = 20
+# Past this many cached prefixes the result cache starts over
+MAX_CACHED_PREFIXES = 10000
+# Prefixes up to this length match the most titles, so their answers are computed right after a build
+PREWARM_PREFIX_LENGTH = 2
+
+def _keys_for(title: str) -> List[str]:
+    """The normalized title and each of its word suffixes, so 'knight' finds 'The Dark Knight'."""
+    words = title_key(title).split()
+    return [" ".join(words[start:]) for start in range(len(words))]
+
+def _prefixes(keys: List[str]) -> set:
+    return {key[:length] for key in keys for length in range(1, len(key) + 1)}
+
+def _weight(movie: Dict[str, Any]) -> float:
+    """
+    The rating, which ingested movies and fallback saves both carry on the same 0-10 scale.
+    (Only fallback saves have TMDB's popularity, so ranking on it would put them above the whole catalog.)
+    """
+    return float(movie.get("vote_average") or 0)
+
+class TitleSuggestions(MovieIndex):
+    """
+    In-memory typeahead over movie titles. Every normalized title and word suffix sits in one sorted
+    array of (key, movie_id). A prefix is a bisect range in that array, ranked by rating, and each
+    prefix's answer is cached (and kept current on writes). Rebuilt every SUGGEST_REBUILD_INTERVAL
+    seconds (see MovieIndex).
+    """
+
+    description = "title suggestions"
+
+    def __init__(self):
+        super().__init__()
+        self._keys: List[Tuple[str, int]] = []
+        self._movies: Dict[int, Dict[str, Any]] = {}
+        self._cache: Dict[str, List[int]] = {}
+
+    @property
+    def rebuild_interval(self) -> float:
+        return settings.SUGGEST_REBUILD_INTERVAL
+
+    def __len__(self):
+        return len(self._movies)
+
+    def __contains__(self, movie_id: int):
+        return movie_id in self._movies
+
+    def suggest(self, query: str, limit: int = 8) -> List[Dict[str, Any]]:
+        prefix = " ".join(title_key(query).split())
+        if not prefix:
+            return []
+        movie_ids = self._cache.get(prefix)
+        if movie_ids is None:
+            start = bisect_left(self._keys, (prefix,))
+            end = bisect_left(self._keys, (prefix + "\U0010ffff",), start)
+            candidates = {movie_id for _, movie_id in self._keys[start:end]}
+            movie_ids = heapq.nlargest(MAX_SUGGESTIONS, candidates, key=lambda movie_id: self._movies[movie_id]["weight"])
+            if len(self._cache) >= MAX_CACHED_PREFIXES:
+                self._cache.clear()
+            self._cache[prefix] = movie_ids
+        return [self._suggestion(movie_id) for movie_id in movie_ids[:limit]]
+
+    def _apply(self, movie_id: int, movie: Dict[str, Any]):
+        self.remove(movie_id)
+        if not movie.get("title"):
+            return
+        self._movies[movie_id] = self._entry(movie)
+        keys = _keys_for(movie["title"])
+        for key in keys:
+            insort(self._keys, (key, movie_id))
+        # Cached answers the new movie could enter
+        weight = lambda candidate: self._movies[candidate]["weight"]
+        for prefix in _prefixes(keys):
+            cached = self._cache.get(prefix)
+            if cached is not None:
+                self._cache[prefix] = heapq.nlargest(MAX_SUGGESTIONS, cached + [movie_id], key=weight)
+
+    def remove(self, movie_id: int):
+        entry = self._movies.pop(movie_id, None)
+        if entry is None:
+            return
+        keys = _keys_for(entry["title"])
+        for key in keys:
+            index = bisect_left(self._keys, (key, movie_id))
+            if index < len(self._keys) and self._keys[index] == (key, movie_id):
+                del self._keys[index]
+        # Answers that listed the movie are recomputed on their next request
+        for prefix in _prefixes(keys):
+            if movie_id in self._cache.get(prefix, ()):
+                del self._cache[prefix]
+
+    async def _load(self, collection):
+        keys, movies = [], {}
+        async for movie in collection.find({"title": {"$nin": [None, ""]}}, SUGGEST_PROJECTION):
+            movies[movie["_id"]] = self._entry(movie)
+            keys.extend((key, movie["_id"]) for key in _keys_for(movie["title"]))
+        keys.sort()
+        return keys, movies
+
+    def _swap(self, state):
+        self._keys, self._movies = state
+        self._cache = {}
+
+    async def _after_build(self):
+        print(f"✅ Title suggestions ready for {len(self._movies)} movies.")
+        for prefix in sorted({key[:length] for key, _ in self._keys for length in range(1, PREWARM_PREFIX_LENGTH + 1)}):
+            self.suggest(prefix)
+            await asyncio.sleep(0) # Let requests through between prefixes
+
+    def _entry(self, movie: Dict[str, Any]) -> Dict[str, Any]:
+        release_date = movie.get("release_date") or ""
+        return {
+            "title": movie["title"],
+            "release_year": int(release_date[:4]) if release_date[:4].isdigit() else None,
+            "poster_path": movie.get("poster_path"),
+            "weight": _weight(movie),
+        }
+
+    def _suggestion(self, movie_id: int) -> Dict[str, Any]:
+        entry = self._movies[movie_id]
+        return {"id": movie_id, "title": entry["title"], "release_year": entry["release_year"], "poster_path": entry["poster_path"]}
@@ -0,0 +1,12 @@
+import unicodedata
+
+def title_key(title: str) -> str:
+    """
+    Case- and accent-insensitive form of a movie title, stored on movies as 'title_key':
+    'Amélie ' and 'AMELIE' both become 'amelie'. Must match ContentIngestion's documents.title_key.
+    """
+    if not title:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", title)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
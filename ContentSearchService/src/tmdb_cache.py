@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from .settings import settings
+
+# Movie sub-resources cached in Mongo: name -> (TMDB path, how to trim the response, TTL in seconds)
+CACHED_RESOURCES = {
+    "credits": ("/movie/{movie_id}/credits", lambda data: data, settings.CREDITS_CACHE_TTL),
+    "similar_movies": ("/movie/{movie_id}/similar", lambda data: data.get("results", [])[:6], settings.SIMILAR_CACHE_TTL),
+    "videos": ("/movie/{movie_id}/videos", lambda data: data.get("results", []), settings.VIDEOS_CACHE_TTL),
+}
+
+def _as_utc(value: datetime) -> datetime:
+    """Mongo hands datetimes back naive (in UTC)."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+class TMDBResourceCache:
+    """
+    Read-through cache of TMDB movie sub-resources, stored in the tmdb_cache collection.
+    A fresh entry is served without calling TMDB. Once an entry is within the last
+    TMDB_CACHE_REFRESH_AHEAD fraction of its TTL it is still served, and a background task
+    refreshes it. Expired entries are fetched inline, and a TTL index purges them from Mongo.
+    """
+
+    def __init__(self, collection, tmdb):
+        self.collection = collection
+        self.tmdb = tmdb
+        self._refreshing = set()
+        self._background_tasks = set()
+
+    async def get(self, resource: str, movie_id: int) -> Optional[Any]:
+        """The cached `resource` of a movie, fetched from TMDB on a miss; None if TMDB has none."""
+        key = f"{resource}:{movie_id}"
+        entry = None
+        if self.collection is not None:
+            try:
+                entry = await self.collection.find_one({"_id": key})
+            except Exception as e:
+                print(f"❌ TMDB cache read error: {e}")
+
+        now = datetime.now(timezone.utc)
+        if entry is not None and _as_utc(entry["expires_at"]) > now:
+            ttl = CACHED_RESOURCES[resource][2]
+            if _as_utc(entry["expires_at"]) - now < timedelta(seconds=ttl * settings.TMDB_CACHE_REFRESH_AHEAD):
+                self._refresh_in_background(resource, movie_id)
+            return entry["data"]
+        return await self._fetch_and_store(resource, movie_id)
+
+    async def _fetch_and_store(self, resource: str, movie_id: int) -> Optional[Any]:
+        path, trim, ttl = CACHED_RESOURCES[resource]
+        data = await self.tmdb.get(path.format(movie_id=movie_id))
+        if data is None:
+            return None
+        value = trim(data)
+        if self.collection is not None:
+            now = datetime.now(timezone.utc)
+            try:
+                await self.collection.replace_one(
+                    {"_id": f"{resource}:{movie_id}"},
+                    {"resource": resource, "movie_id": movie_id, "data": value,
+                     "fetched_at": now, "expires_at": now + timedelta(seconds=ttl)},
+                    upsert=True
+                )
+            except Exception as e:
+                print(f"❌ TMDB cache write error: {e}")
+        return value
+
+    def _refresh_in_background(self, resource: str, movie_id: int):
+        """Refreshes an entry that is about to expire, at most once at a time per entry."""
+        key = f"{resource}:{movie_id}"
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                await self._fetch_and_store(resource, movie_id)
+            except Exception as e:
+                print(f"⚠️ Background refresh of {key} failed: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        self.keep_running(asyncio.create_task(refresh()))
+
+    def keep_running(self, task: asyncio.Task):
+        """Holds a reference to a task nobody awaits, so it can finish (and fill the cache)."""
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
@@ -0,0 +1,131 @@
+import asyncio
+import math
+import random
+import re
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+import httpx
+from .settings import settings
+
+# Responses worth retrying: throttling and transient server-side failures
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# Latencies kept per endpoint for the percentiles
+LATENCY_WINDOW = 1000
+
+class TMDBRequestError(Exception):
+    """Raised when a TMDB request still fails after its retries."""
+
+def endpoint_name(path: str) -> str:
+    """Groups requests by endpoint, e.g. '/movie/550/credits' -> '/movie/{id}/credits'."""
+    return re.sub(r"/\d+", "/{id}", path)
+
+class EndpointStats:
+    """Request counters and recent latencies of one TMDB endpoint."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def percentile(self, percentile: float) -> float:
+        """Nearest-rank percentile of the recent latencies, in milliseconds."""
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return 0.0
+        rank = max(1, math.ceil(percentile / 100 * len(latencies)))
+        return round(latencies[rank - 1] * 1000, 2)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+        }
+
+class TMDBClient:
+    """
+    One pooled, keep-alive HTTP client for every TMDB call the service makes.
+    Connections are reused across requests, each phase of a request has its own timeout,
+    throttled and 5xx responses are retried a bounded number of times, and every endpoint
+    keeps its own latency and error counters.
+    """
+
+    def __init__(self):
+        self.http = httpx.AsyncClient(
+            base_url=settings.TMDB_API_URL,
+            headers={
+                "accept": "application/json",
+                "Authorization": f"Bearer {settings.TMDB_READ_ACCESS_TOKEN}"
+            },
+            timeout=httpx.Timeout(
+                connect=settings.TMDB_CONNECT_TIMEOUT,
+                read=settings.TMDB_READ_TIMEOUT,
+                write=settings.TMDB_WRITE_TIMEOUT,
+                pool=settings.TMDB_POOL_TIMEOUT
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.TMDB_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.TMDB_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.TMDB_KEEPALIVE_EXPIRY
+            )
+        )
+        self.stats: Dict[str, EndpointStats] = {}
+
+    async def close(self):
+        await self.http.aclose()
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        GETs a TMDB path (relative to TMDB_API_URL) and returns the decoded JSON body.
+        Returns None when TMDB answers with a non-retryable error such as 404, and raises
+        TMDBRequestError once TMDB_MAX_RETRIES retries of a transient failure are used up.
+        """
+        stats = self.stats.setdefault(endpoint_name(path), EndpointStats())
+        for attempt in range(settings.TMDB_MAX_RETRIES + 1):
+            stats.requests += 1
+            retry_after = None
+            started = time.perf_counter()
+            try:
+                response = await self.http.get(path, params=params)
+                stats.latencies.append(time.perf_counter() - started)
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    if response.is_success:
+                        return response.json()
+                    stats.errors += 1
+                    return None
+                error = f"HTTP {response.status_code}"
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            except httpx.TransportError as e:
+                stats.latencies.append(time.perf_counter() - started)
+                error = f"{type(e).__name__}: {e}"
+
+            if attempt == settings.TMDB_MAX_RETRIES:
+                stats.errors += 1
+                raise TMDBRequestError(f"TMDB {path} failed after {attempt + 1} attempts ({error})")
+            stats.retries += 1
+            await asyncio.sleep(_backoff_delay(attempt, retry_after))
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint request counters and latency percentiles."""
+        return {endpoint: stats.snapshot() for endpoint, stats in sorted(self.stats.items())}
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Delta-seconds Retry-After, capped so a user request never waits longer than TMDB_BACKOFF_MAX."""
+    try:
+        return min(settings.TMDB_BACKOFF_MAX, max(0.0, float(value)))
+    except (TypeError, ValueError):
+        return None
+
+def _backoff_delay(attempt: int, retry_after: Optional[float]) -> float:
+    """Retry-After when TMDB sent one, otherwise full-jitter exponential backoff."""
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(settings.TMDB_BACKOFF_MAX, settings.TMDB_BACKOFF_BASE * 2 ** attempt))
+
+# Shared by every TMDB call site in the service
+tmdb_client = TMDBClient()
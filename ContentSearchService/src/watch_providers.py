@@ -0,0 +1,44 @@
+from typing import Any, Dict, Tuple
+
+# Offer types TMDB groups a region's watch providers under
+WATCH_PROVIDER_TYPES = ("flatrate", "rent", "buy", "free", "ads")
+
+def watch_provider_row_id(movie_id: int, region: str) -> str:
+    """_id of a movie's row in the watch_providers collection for one region."""
+    return f"{movie_id}:{region}"
+
+def compact_watch_providers(movie_id: int, region: str, providers: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[int, Dict[str, Any]]]:
+    """
+    Splits one region's TMDB watch providers into a compact watch_providers row, which references
+    providers by ID only, and the {provider_id: {name, logo_path}} details it references.
+    A row without offer lists records that the movie has no providers in that region.
+    """
+    row = {"_id": watch_provider_row_id(movie_id, region), "movie_id": movie_id, "region": region}
+    if providers.get("link"):
+        row["link"] = providers["link"]
+    referenced = {}
+    for offer_type in WATCH_PROVIDER_TYPES:
+        entries = [entry for entry in providers.get(offer_type) or [] if entry.get("provider_id") is not None]
+        if not entries:
+            continue
+        row[offer_type] = [entry["provider_id"] for entry in entries]
+        for entry in entries:
+            referenced[entry["provider_id"]] = {"name": entry.get("provider_name"), "logo_path": entry.get("logo_path")}
+    return row, referenced
+
+def expand_watch_providers(row: Dict[str, Any], provider_details: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    """Rebuilds the single-region TMDB shape ({link, flatrate: [{provider_id, provider_name, logo_path}], ...}) clients expect."""
+    providers = {}
+    if row.get("link"):
+        providers["link"] = row["link"]
+    for offer_type in WATCH_PROVIDER_TYPES:
+        if row.get(offer_type):
+            providers[offer_type] = [
+                {
+                    "provider_id": provider_id,
+                    "provider_name": provider_details.get(provider_id, {}).get("name"),
+                    "logo_path": provider_details.get(provider_id, {}).get("logo_path"),
+                }
+                for provider_id in row[offer_type]
+            ]
+    return providers
@@ -0,0 +1,137 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pymongo.errors import BulkWriteError
+from .settings import settings
+
+class _PendingWrite:
+    """One queued write, its callbacks, and how many flushes it has failed."""
+    __slots__ = ("write", "on_written", "on_dropped", "failures")
+
+    def __init__(self, write, on_written: Optional[Callable[[], None]], on_dropped: Optional[Callable[[], None]]):
+        self.write = write
+        self.on_written = on_written
+        self.on_dropped = on_dropped
+        self.failures = 0
+
+    def dropped(self):
+        if self.on_dropped is not None:
+            self.on_dropped()
+
+class WriteBehindBuffer:
+    """
+    Collects writes made on behalf of user requests (TMDB fallback saves, watch provider rows) and
+    applies them later as one unordered bulk_write per collection, so the request never waits for them.
+    Every write must be an idempotent upsert keyed by `key`; a newer write for the same key replaces a
+    pending one. The buffer is flushed every WRITE_BEHIND_FLUSH_INTERVAL seconds, as soon as
+    WRITE_BEHIND_BATCH_SIZE writes are pending, and on shutdown.
+    Only the writes that failed are retried on the next flush, behind any newer write for the same key,
+    and a write that failed WRITE_BEHIND_MAX_RETRIES times is dropped. Past WRITE_BEHIND_MAX_PENDING
+    queued writes the oldest are dropped too. `on_written` runs once a write has landed, `on_dropped`
+    when it is given up.
+    """
+
+    def __init__(self):
+        # {collection name: (collection, {key: _PendingWrite})}, oldest first
+        self._pending: Dict[str, Tuple[Any, Dict[Any, _PendingWrite]]] = {}
+        self._size = 0
+        self._flush_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return self._size
+
+    def put(self, collection, key, write, on_written: Optional[Callable[[], None]] = None,
+            on_dropped: Optional[Callable[[], None]] = None):
+        if collection is None:
+            return
+        writes = self._pending.setdefault(collection.name, (collection, {}))[1]
+        if key not in writes:
+            self._size += 1
+        writes[key] = _PendingWrite(write, on_written, on_dropped)
+        self._drop_oldest()
+        if self._size >= settings.WRITE_BEHIND_BATCH_SIZE:
+            self._flush_in_background()
+
+    def _flush_in_background(self) -> asyncio.Task:
+        """Starts a flush unless one is already running, and returns the running one."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.flush())
+        return self._flush_task
+
+    async def flush(self):
+        pending, self._pending, self._size = self._pending, {}, 0
+        for name, (collection, writes) in pending.items():
+            entries = list(writes.items())
+            try:
+                await collection.bulk_write([entry.write for _, entry in entries], ordered=False)
+                failed = set()
+            except BulkWriteError as e:
+                # Unordered: everything not listed in writeErrors has landed
+                errors = e.details.get("writeErrors", [])
+                failed = {error["index"] for error in errors}
+                print(f"❌ {len(failed)} of {len(entries)} write-behind writes to '{name}' failed: "
+                      f"{errors[0].get('errmsg') if errors else e}")
+            except Exception as e:
+                failed = set(range(len(entries)))
+                print(f"❌ Write-behind flush of {len(entries)} writes to '{name}' failed: {e}")
+
+            retry = []
+            for index, (key, entry) in enumerate(entries):
+                if index in failed:
+                    retry.append((key, entry))
+                elif entry.on_written is not None:
+                    entry.on_written()
+            if retry:
+                self._requeue(collection, retry)
+
+    def _requeue(self, collection, retry: List[Tuple[Any, _PendingWrite]]):
+        """
+        Puts failed writes back ahead of the ones queued since, which are newer; a write queued
+        for the same key since the flush started wins. Writes out of retries are dropped.
+        """
+        queued = self._pending.get(collection.name, (collection, {}))[1]
+        retried, given_up = {}, 0
+        for key, entry in retry:
+            if key in queued:
+                continue
+            entry.failures += 1
+            if entry.failures > settings.WRITE_BEHIND_MAX_RETRIES:
+                given_up += 1
+                entry.dropped()
+            else:
+                retried[key] = entry
+        if given_up:
+            print(f"⚠️ Dropped {given_up} write-behind writes to '{collection.name}' after {settings.WRITE_BEHIND_MAX_RETRIES} retries.")
+        self._pending[collection.name] = (collection, {**retried, **queued})
+        self._size += len(retried)
+        self._drop_oldest()
+
+    def _drop_oldest(self):
+        """Drops the oldest queued writes while more than WRITE_BEHIND_MAX_PENDING are pending."""
+        excess = self._size - settings.WRITE_BEHIND_MAX_PENDING
+        if excess <= 0:
+            return
+        for _, writes in self._pending.values():
+            while writes and self._size > settings.WRITE_BEHIND_MAX_PENDING:
+                writes.pop(next(iter(writes))).dropped()
+                self._size -= 1
+        print(f"⚠️ Write-behind buffer full: dropped the {excess} oldest writes.")
+
+    def start(self):
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self):
+        """Stops the periodic flush and writes out whatever is still pending."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            self._loop_task = None
+        if self._flush_task is not None:
+            await self._flush_task
+        await self.flush()
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(settings.WRITE_BEHIND_FLUSH_INTERVAL)
+            # Shielded, so stopping the loop never cancels a bulk_write halfway
+            await asyncio.shield(self._flush_in_background())
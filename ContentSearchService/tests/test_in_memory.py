@@ -0,0 +1,218 @@
+"""Tests of the service's in-memory structures; none of them needs Mongo or TMDB."""
+import asyncio
+import time
+import pytest
+from pymongo.errors import BulkWriteError
+from src.bm25 import BM25Index
+from src.negative_cache import NegativeCache
+from src.settings import settings
+from src.single_flight import SingleFlight
+from src.suggest import TitleSuggestions
+from src.titles import title_key
+from src.write_behind import WriteBehindBuffer
+
+def movie(movie_id, title, vote_average=5.0, overview="", genres=()):
+    return {"_id": movie_id, "title": title, "vote_average": vote_average, "overview": overview, "genres": list(genres)}
+
+class FakeCollection:
+    """Just enough of an async pymongo collection: find() over fixed documents and a scriptable bulk_write."""
+
+    def __init__(self, documents=(), name="movies"):
+        self.documents = list(documents)
+        self.name = name
+        self.during_find = None
+        self.failures = []
+        self.written = []
+
+    def find(self, query=None, projection=None):
+        async def cursor():
+            for document in self.documents:
+                yield document
+                if self.during_find is not None:
+                    self.during_find()
+                    self.during_find = None
+        return cursor()
+
+    async def bulk_write(self, writes, ordered=True):
+        failure = self.failures.pop(0) if self.failures else None
+        if isinstance(failure, set):
+            self.written += [write for index, write in enumerate(writes) if index not in failure]
+            raise BulkWriteError({"writeErrors": [{"index": index, "errmsg": "failed"} for index in sorted(failure)]})
+        if failure is not None:
+            raise failure
+        self.written += writes
+
+# ---------------------------------------------------------------- title_key
+
+def test_title_key_folds_case_accents_and_whitespace():
+    assert title_key("  Amélie ") == "amelie"
+    assert title_key("AMELIE") == "amelie"
+    assert title_key("The   Dark\tKnight") == "the dark knight"
+    assert title_key(None) == ""
+
+# ---------------------------------------------------------------- title suggestions
+
+def built_suggestions(*movies):
+    suggestions = TitleSuggestions()
+    asyncio.run(suggestions.build(FakeCollection(movies)))
+    return suggestions
+
+def ids(results):
+    return [result["id"] for result in results]
+
+def test_suggest_matches_title_and_word_prefixes_best_rated_first():
+    suggestions = built_suggestions(movie(1, "The Dark Knight", 9.0), movie(2, "Darkness Falls", 4.0), movie(3, "Up", 8.0))
+    assert ids(suggestions.suggest("dark")) == [1, 2]
+    assert ids(suggestions.suggest("knig")) == [1]
+    assert ids(suggestions.suggest("DÁRK")) == [1, 2]
+    assert suggestions.suggest("  ") == []
+
+def test_suggest_cache_follows_add_and_remove():
+    suggestions = built_suggestions(movie(1, "Dune", 8.0), movie(2, "Dunkirk", 7.8))
+    assert ids(suggestions.suggest("dun")) == [1, 2]  # now cached
+    suggestions.add({"id": 3, "title": "Dune: Part Two", "vote_average": 8.5})
+    assert ids(suggestions.suggest("dun")) == [3, 1, 2]
+    suggestions.remove(1)
+    assert ids(suggestions.suggest("dun")) == [3, 2]
+    # Re-adding under a new title drops the old keys
+    suggestions.add({"id": 2, "title": "Tenet", "vote_average": 7.3})
+    assert ids(suggestions.suggest("dun")) == [3]
+    assert ids(suggestions.suggest("ten")) == [2]
+
+def test_suggest_rebuild_keeps_movies_added_while_reading_mongo():
+    suggestions = TitleSuggestions()
+    collection = FakeCollection([movie(1, "Alpha")])
+    collection.during_find = lambda: suggestions.add({"id": 2, "title": "Alpine", "vote_average": 7.0})
+    asyncio.run(suggestions.build(collection))
+    assert ids(suggestions.suggest("alp")) == [2, 1]
+
+# ---------------------------------------------------------------- BM25
+
+def built_index(*movies):
+    index = BM25Index()
+    asyncio.run(index.build(FakeCollection(movies)))
+    return index
+
+def test_bm25_ranks_title_matches_above_overview_matches():
+    index = built_index(
+        movie(1, "The Dark Knight", overview="Batman fights the Joker."),
+        movie(2, "Joker", overview="A failed comedian; the dark origin of a knight's nemesis."),
+        movie(3, "Up", overview="A balloon trip."),
+    )
+    assert index.ready
+    assert index.search("dark knight") == [1, 2]
+    assert index.search("joker") == [2, 1]
+    assert index.search("balloon") == [3]
+    assert index.search("nothing matches") == []
+    assert index.search("dark knight", limit=1) == [1]
+
+def test_bm25_applies_genre_and_rating_filters():
+    index = built_index(
+        movie(1, "Knight and Day", 6.3, genres=["Comedy"]),
+        movie(2, "The Dark Knight", 9.0, genres=["Action"]),
+    )
+    assert index.search("knight", filters={"genres": {"$in": ["Comedy"]}}) == [1]
+    assert index.search("knight", filters={"vote_average": {"$gte": 8}}) == [2]
+
+def test_bm25_add_replaces_and_remove_forgets():
+    index = built_index(movie(1, "Heat"))
+    index.add({"id": 1, "title": "Ronin", "overview": "", "genre_ids": [], "vote_average": 7})
+    assert index.search("heat") == []
+    assert index.search("ronin") == [1]
+    index.remove(1)
+    assert index.search("ronin") == [] and len(index) == 0
+
+def test_bm25_rebuild_keeps_movies_added_while_reading_mongo():
+    index = BM25Index()
+    collection = FakeCollection([movie(1, "Alpha")])
+    collection.during_find = lambda: index.add(movie(2, "Alpine"))
+    asyncio.run(index.build(collection))
+    assert index.search("alpine") == [2]
+
+# ---------------------------------------------------------------- single flight and negative cache
+
+def test_single_flight_shares_one_call_and_survives_a_cancelled_waiter():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"results": []}
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("dune", work) for _ in range(50)))
+        assert len(calls) == 1 and all(result is results[0] for result in results) and len(flight) == 0
+
+        first = asyncio.create_task(flight.do("dune", work))
+        second = asyncio.create_task(flight.do("dune", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == {"results": []}
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
+
+def test_negative_cache_expires_and_discards(monkeypatch):
+    cache = NegativeCache()
+    cache.add("asdfgh")
+    assert "asdfgh" in cache
+    cache.discard("asdfgh")
+    assert "asdfgh" not in cache
+
+    cache.add("qwerty")
+    later = time.monotonic() + settings.NEGATIVE_CACHE_TTL + 1
+    monkeypatch.setattr("src.ttl_cache.time.monotonic", lambda: later)
+    assert "qwerty" not in cache and len(cache) == 0
+
+# ---------------------------------------------------------------- write-behind
+
+def test_write_behind_requeues_only_failed_writes_behind_newer_ones():
+    async def scenario():
+        buffer, collection, written = WriteBehindBuffer(), FakeCollection(name="rows"), []
+        for key in "abc":
+            buffer.put(collection, key, f"{key}1", on_written=lambda key=key: written.append(key))
+        collection.failures = [{0, 2}]  # a and c fail, b lands
+        await buffer.flush()
+        assert collection.written == ["b1"] and written == ["b"] and len(buffer) == 2
+
+        buffer.put(collection, "a", "a2")  # newer than the failed a1
+        buffer.put(collection, "d", "d1")
+        await buffer.flush()
+        # a2 replaces a1 in its requeued slot, ahead of the newer d1
+        assert collection.written == ["b1", "a2", "c1", "d1"] and len(buffer) == 0
+
+    asyncio.run(scenario())
+
+def test_write_behind_drops_writes_out_of_retries(monkeypatch):
+    monkeypatch.setattr(settings, "WRITE_BEHIND_MAX_RETRIES", 1)
+
+    async def scenario():
+        buffer, collection, dropped = WriteBehindBuffer(), FakeCollection(name="rows"), []
+        buffer.put(collection, "a", "a1", on_dropped=lambda: dropped.append("a"))
+        collection.failures = [RuntimeError("down"), RuntimeError("down")]
+        await buffer.flush()
+        assert len(buffer) == 1 and not dropped
+        await buffer.flush()
+        assert len(buffer) == 0 and dropped == ["a"]
+
+    asyncio.run(scenario())
+
+def test_write_behind_drops_the_oldest_writes_when_full(monkeypatch):
+    monkeypatch.setattr(settings, "WRITE_BEHIND_MAX_PENDING", 2)
+    buffer, collection, dropped = WriteBehindBuffer(), FakeCollection(name="rows"), []
+    for key in "abc":
+        buffer.put(collection, key, key, on_dropped=lambda key=key: dropped.append(key))
+    assert len(buffer) == 2 and dropped == ["a"]
+
+# ---------------------------------------------------------------- page cursors
+
+def test_page_cursor_round_trip_and_rejections():
+    pytest.importorskip("fastapi")
+    from src import service
+    token = service.encode_page_cursor("vote_average", "desc", {"_id": 550, "vote_average": 8.4})
+    assert service.decode_page_cursor(token, "vote_average", "desc") == {"s": "vote_average", "o": "desc", "v": 8.4, "id": 550}
+    with pytest.raises(ValueError):
+        service.decode_page_cursor(token, "release_date", "desc")
+    with pytest.raises(ValueError):
+        service.decode_page_cursor("not a cursor", "vote_average", "desc")